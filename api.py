@@ -0,0 +1,262 @@
+# -----------------------------
+# 🔌 API de agregados (sem Streamlit)
+# -----------------------------
+# Os números dos dashboards (escolas por dependência/localização/região,
+# energia, água, lixo, matrículas por cor/raça, correlação) servidos em JSON
+# para outras ferramentas, a partir da mesma base e do mesmo cubo de agregados
+# (dados.py, cubo.py, correlacao.py). Só biblioteca padrão: ThreadingHTTPServer
+# atende as requisições em paralelo, cada base é montada uma vez por processo e
+# as respostas ficam num LRU; o ETag (agregado, anos, filtros e versão dos
+# dados) permite ao cliente revalidar com If-None-Match e receber 304.
+#
+#   python api.py --porta 8502
+#   GET /anos
+#   GET /agregados
+#   GET /agregados/dependencia?ano=2021&ano=2022&TP_DEPENDENCIA=2,3
+#
+# Filtros: qualquer coluna de cubo.CHAVES, com os códigos do INEP separados por
+# vírgula. Sem ano, usa o mais recente. consultar() é o cliente (para um
+# dashboard que só desenha os números).
+#
+# Com CENSO_BACKEND=duckdb (consultas.py) as contagens e somas são consultas
+# direto nos Parquet dos anos, sem montar a base na memória, e os filtros
+# podem usar qualquer coluna dos arquivos (p.ex. IN_INTERNET=1).
+
+import argparse
+import functools
+import hashlib
+import json
+import math
+import threading
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+import consultas
+import correlacao
+import cubo
+import dados
+
+# Respostas prontas guardadas (agregado x anos x filtros x versão)
+MAX_RESPOSTAS = 512
+
+AGREGADOS = {
+    "dependencia": lambda r: cubo.contar(r["cubo"], 'TP_DEPENDENCIA', dados.DEPENDENCIAS),
+    "localizacao": lambda r: cubo.contar(r["cubo"], 'TP_LOCALIZACAO', dados.LOCALIZACOES),
+    "energia": lambda r: cubo.contar(r["cubo"], 'IN_ENERGIA_RENOVAVEL', dados.ENERGIAS),
+    "regioes": lambda r: cubo.contar(r["cubo"], 'NO_REGIAO'),
+    "agua": lambda r: cubo.somar(r["cubo"], dados.COLUNAS_AGUA),
+    "lixo": lambda r: cubo.somar(r["cubo"], dados.COLUNAS_LIXO),
+    "raca": lambda r: cubo.somar(r["cubo"], dados.COLUNAS_RACA),
+    "correlacao": lambda r: correlacao.matriz(r["estatisticas"]),
+}
+
+# Partições e bases já montadas, por ano. Uma trava por ano só para a montagem:
+# o download de um ano novo não segura as requisições dos anos já prontos
+_parquets = {}
+_bases = {}
+_travas_anos = {}
+_trava_travas = threading.Lock()
+
+
+class ErroConsulta(ValueError):
+    def __init__(self, mensagem, status=400):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def trava_do_ano(ano):
+    with _trava_travas:
+        # RLock: a montagem da base pede o Parquet do mesmo ano dentro da trava
+        return _travas_anos.setdefault(ano, threading.RLock())
+
+
+def uma_vez_por_ano(prontos, ano, montar):
+    # Já pronto: leitura do dict, sem trava. Senão, só quem pede o mesmo ano espera
+    if ano in prontos:
+        return prontos[ano]
+    with trava_do_ano(ano):
+        if ano not in prontos:
+            prontos[ano] = montar(ano)
+        return prontos[ano]
+
+
+def parquet_do_ano(ano):
+    # Download e ingestão uma vez por ano e por processo
+    return uma_vez_por_ano(_parquets, ano, dados.garantir_ano)
+
+
+def base_do_ano(ano):
+    # Uma base por ano e por processo, montada uma vez mesmo com requisições em paralelo
+    return uma_vez_por_ano(_bases, ano, lambda a: dados.montar_base(parquet=parquet_do_ano(a)))
+
+
+def estatisticas_do_ano(ano):
+    if consultas.usar_duckdb():
+        # Gravadas na ingestão ao lado do Parquet; a base só é montada se estiverem desatualizadas
+        return dados.carregar_agregado(parquet_do_ano(ano), "corr", lambda: base_do_ano(ano).estatisticas)
+    return base_do_ano(ano).estatisticas
+
+
+def colunas_filtraveis(anos):
+    if consultas.usar_duckdb():
+        return consultas.colunas_dos_arquivos([parquet_do_ano(ano) for ano in anos])
+    return cubo.CHAVES
+
+
+def ler_consulta(texto):
+    """Anos e filtros da query string: ([anos], {coluna: [códigos]}), já em ordem."""
+    parametros = urllib.parse.parse_qs(texto)
+    disponiveis = dados.anos_disponiveis()
+    try:
+        anos = sorted({int(a) for valor in parametros.pop("ano", []) for a in valor.split(",")})
+    except ValueError:
+        raise ErroConsulta("ano deve ser numérico")
+    anos = anos or disponiveis[-1:]
+    if not set(anos) <= set(disponiveis):
+        raise ErroConsulta(f"anos disponíveis: {disponiveis}", 404)
+
+    selecao = {}
+    permitidas = colunas_filtraveis(anos) if parametros else []
+    for coluna, valores in parametros.items():
+        if coluna not in permitidas:
+            raise ErroConsulta(f"filtro desconhecido: {coluna} (use {', '.join(permitidas)})")
+        codigos = [c for valor in valores for c in valor.split(",") if c]
+        if coluna == 'NO_REGIAO':
+            # Regiões pelos nomes de dados.REGIOES
+            selecao[coluna] = sorted({c.upper() for c in codigos})
+            continue
+        try:
+            selecao[coluna] = sorted({int(c) for c in codigos})
+        except ValueError:
+            raise ErroConsulta(f"{coluna} espera códigos numéricos do INEP")
+    return anos, selecao
+
+
+def para_json(agregado):
+    # Series -> {rótulo: valor}; DataFrame (correlação) -> {linha: {coluna: valor}}; NaN -> null
+    def valor(v):
+        v = v.item() if hasattr(v, "item") else v
+        return None if isinstance(v, float) and math.isnan(v) else v
+    if isinstance(agregado, pd.Series):
+        return {str(k): valor(v) for k, v in agregado.items()}
+    return {str(i): {str(c): valor(v) for c, v in linha.items()} for i, linha in agregado.iterrows()}
+
+
+def etag(nome, anos, selecao):
+    # Com o ano já ingerido não passa por trava nenhuma (parquet_do_ano lê o dict)
+    versoes = [dados.versao_dos_dados(parquet=parquet_do_ano(ano)) for ano in anos]
+    chave = json.dumps([nome, anos, sorted(selecao.items()), versoes], sort_keys=True)
+    return '"' + hashlib.sha1(chave.encode()).hexdigest()[:20] + '"'
+
+
+@functools.lru_cache(maxsize=MAX_RESPOSTAS)
+def _resposta(nome, anos, estado, etiqueta):
+    # etiqueta (ETag) entra na chave: uma versão nova dos dados nunca reaproveita a resposta antiga
+    selecao = {coluna: list(codigos) for coluna, codigos in estado}
+    corpo = {"agregado": nome, "anos": list(anos), "filtros": selecao,
+             "valores": para_json(AGREGADOS[nome](recortar(nome, anos, selecao)))}
+    return json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+
+
+def recortar(nome, anos, selecao):
+    # Só o que o agregado usa: estatísticas para a correlação, o cubo para o resto
+    if nome == "correlacao":
+        estatisticas = [estatisticas_do_ano(ano) for ano in anos]
+        estatisticas = cubo.combinar(estatisticas) if len(estatisticas) > 1 else estatisticas[0]
+        return {"estatisticas": cubo.filtrar(estatisticas, **selecao)}
+    if consultas.usar_duckdb():
+        # Uma consulta sobre os arquivos de todos os anos, com os filtros na leitura
+        return {"cubo": consultas.montar_cubo([parquet_do_ano(ano) for ano in anos], **selecao)}
+    cubos = [base_do_ano(ano).cubo for ano in anos]
+    return {"cubo": cubo.filtrar(cubo.combinar(cubos) if len(cubos) > 1 else cubos[0], **selecao)}
+
+
+def responder(nome, texto_consulta, if_none_match=""):
+    """(ETag, corpo JSON em bytes) do agregado; corpo None quando o cliente já tem essa versão."""
+    if nome not in AGREGADOS:
+        raise ErroConsulta(f"agregado desconhecido: {nome} (use {', '.join(AGREGADOS)})", 404)
+    anos, selecao = ler_consulta(texto_consulta)
+    if nome == "correlacao" and not set(selecao) <= set(cubo.CHAVES):
+        raise ErroConsulta(f"a correlação só aceita filtros em {', '.join(cubo.CHAVES)}")
+    etiqueta = etag(nome, anos, selecao)
+    if etiqueta in if_none_match:
+        return etiqueta, None
+    estado = tuple(sorted((coluna, tuple(codigos)) for coluna, codigos in selecao.items()))
+    return etiqueta, _resposta(nome, tuple(anos), estado, etiqueta)
+
+
+class Manipulador(BaseHTTPRequestHandler):
+    def enviar(self, status, corpo=b"", etiqueta=None):
+        self.send_response(status)
+        if etiqueta:
+            self.send_header("ETag", etiqueta)
+            # O cliente pode guardar, mas deve revalidar (If-None-Match) antes de usar
+            self.send_header("Cache-Control", "no-cache")
+        if corpo:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        if corpo and self.command != "HEAD":
+            self.wfile.write(corpo)
+
+    def enviar_json(self, status, conteudo):
+        self.enviar(status, json.dumps(conteudo, ensure_ascii=False).encode("utf-8"))
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        partes = [p for p in url.path.split("/") if p]
+        try:
+            if partes == ["anos"]:
+                self.enviar_json(200, dados.anos_disponiveis())
+            elif partes == ["agregados"]:
+                self.enviar_json(200, list(AGREGADOS))
+            elif len(partes) == 2 and partes[0] == "agregados":
+                etiqueta, corpo = responder(partes[1], url.query, self.headers.get("If-None-Match", ""))
+                if corpo is None:
+                    self.enviar(304, etiqueta=etiqueta)
+                else:
+                    self.enviar(200, corpo, etiqueta)
+            else:
+                self.enviar_json(404, {"erro": "use /anos, /agregados ou /agregados/<nome>"})
+        except ErroConsulta as erro:
+            self.enviar_json(erro.status, {"erro": str(erro)})
+        except Exception as erro:
+            self.log_error("%s: %r", self.path, erro)
+            self.enviar_json(500, {"erro": "falha ao montar o agregado"})
+
+    do_HEAD = do_GET
+
+
+def servir(host="127.0.0.1", porta=8502):
+    servidor = ThreadingHTTPServer((host, porta), Manipulador)
+    servidor.daemon_threads = True
+    print(f"API do Censo Escolar em http://{host}:{porta}/agregados")
+    servidor.serve_forever()
+
+
+# -----------------------------
+# 📡 Cliente
+# -----------------------------
+def consultar(nome, anos=None, selecao=None, url="http://127.0.0.1:8502", timeout=30):
+    """Agregado da API como Series (ou DataFrame, para a correlação), com os mesmos filtros do dashboard."""
+    parametros = [("ano", ano) for ano in anos or []]
+    for coluna, codigos in (selecao or {}).items():
+        if codigos is not None:
+            parametros.append((coluna, ",".join(str(c) for c in codigos)))
+    endereco = f"{url}/agregados/{nome}?{urllib.parse.urlencode(parametros)}"
+    with urllib.request.urlopen(endereco, timeout=timeout) as resposta:
+        valores = json.load(resposta)["valores"]
+    if valores and isinstance(next(iter(valores.values())), dict):
+        return pd.DataFrame(valores).T
+    return pd.Series(valores, dtype="float64")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API JSON com os agregados do Censo Escolar")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8502)
+    args = parser.parse_args()
+    servir(args.host, args.porta)
@@ -0,0 +1,255 @@
+# -----------------------------
+# ⏱️ Benchmark com microdados sintéticos
+# -----------------------------
+# O único conjunto de dados real é o download do Google Drive, o que impede
+# medir regressões em qualquer máquina. Aqui são gerados microdados sintéticos
+# com o mesmo esquema do CSV do INEP (separador ';', latin1, códigos TP_*,
+# indicadores IN_* com faltantes, contagens QT_MAT_BAS_*, região, município e
+# coordenadas, mais colunas que os dashboards não usam) e cada etapa do
+# caminho dos dashboards é cronometrada: CSV -> Parquet, leitura, rótulos,
+# filtros, agregações de cada aba, correlação, mapa e treino/previsão dos
+# modelos. O resultado vai para um JSON, para comparar execuções depois.
+#
+# Os modelos só são medidos até --max-linhas-modelos (padrão 300 mil): acima
+# disso o Random Forest e a força bruta de referência do KNN (avaliar_indice,
+# em vizinhos.py) levariam horas no tamanho de 5 milhões.
+#
+#   python benchmark.py                      # 10 mil, 225 mil e 5 milhões de linhas
+#   python benchmark.py 10000 --sem-modelos  # só um tamanho, sem KNN/Random Forest
+#   python benchmark.py --max-linhas-modelos 0   # modelos em todos os tamanhos
+#   python benchmark.py --pasta bench        # guarda (e reaproveita) os CSVs gerados
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import consultas
+import correlacao
+import cubo
+import dados
+import filtros
+import mapa
+import modelos
+import pontos
+
+# Aproximadamente uma amostra, o Censo inteiro (~225 mil escolas) e vários anos juntos
+TAMANHOS = [10_000, 225_000, 5_000_000]
+
+# Maior tamanho em que os modelos são treinados (0 = sem limite)
+MAX_LINHAS_MODELOS = 300_000
+
+# Linhas geradas por vez (limita a memória do gerador nos tamanhos grandes)
+LINHAS_POR_BLOCO = 500_000
+
+# Colunas do CSV que nenhum dashboard lê (o arquivo real tem centenas)
+COLUNAS_EXTRAS = 40
+
+# Proporções aproximadas do Censo 2022
+PROPORCAO_DEPENDENCIA = {1: 0.003, 2: 0.132, 3: 0.6, 4: 0.265}
+PROPORCAO_REGIAO = {"Norte": 0.12, "Nordeste": 0.38, "Sudeste": 0.3, "Sul": 0.13, "Centro-Oeste": 0.07}
+UFS_POR_REGIAO = {
+    "Norte": ["AM", "PA", "AC", "RO", "RR", "AP", "TO"],
+    "Nordeste": ["BA", "PE", "CE", "MA", "PB", "RN", "AL", "SE", "PI"],
+    "Sudeste": ["SP", "MG", "RJ", "ES"],
+    "Sul": ["PR", "SC", "RS"],
+    "Centro-Oeste": ["GO", "MT", "MS", "DF"],
+}
+
+# Seleção usada nas etapas com filtro (duas das quatro dependências)
+SELECAO = {'TP_DEPENDENCIA': [2, 3]}
+
+
+# -----------------------------
+# 🧪 Gerador de microdados
+# -----------------------------
+def gerar_bloco(n, rng, ano=2022):
+    regioes = list(PROPORCAO_REGIAO)
+    pesos = np.array(list(PROPORCAO_REGIAO.values()))
+    regiao = rng.choice(len(regioes), n, p=pesos / pesos.sum())
+
+    bloco = {
+        'NU_ANO_CENSO': np.full(n, ano),
+        'NO_REGIAO': np.array(regioes, dtype=object)[regiao],
+        'SG_UF': np.empty(n, dtype=object),
+        'CO_MUNICIPIO': rng.integers(1_100_015, 5_300_109, n),
+        'TP_DEPENDENCIA': rng.choice(list(PROPORCAO_DEPENDENCIA), n, p=list(PROPORCAO_DEPENDENCIA.values())),
+        'TP_LOCALIZACAO': rng.choice([1, 2], n, p=[0.66, 0.34]),
+    }
+    for r, nome in enumerate(regioes):
+        linhas = regiao == r
+        bloco['SG_UF'][linhas] = rng.choice(UFS_POR_REGIAO[nome], int(linhas.sum()))
+
+    # Coordenadas em torno do centro da região (o mapa de pontos usa NU_LATITUDE/NU_LONGITUDE)
+    centros = np.array([mapa.COORDENADAS_REGIOES[r.upper()] for r in regioes])[regiao]
+    bloco['NU_LATITUDE'] = np.round(centros[:, 0] + rng.normal(0, 3, n), 6)
+    bloco['NU_LONGITUDE'] = np.round(centros[:, 1] + rng.normal(0, 3, n), 6)
+
+    # Indicadores 0/1 com ~2% de faltantes, cada um com a sua frequência
+    indicadores = (['IN_ENERGIA_RENOVAVEL', 'IN_BIBLIOTECA', 'IN_LABORATORIO_INFORMATICA', 'IN_INTERNET']
+                   + dados.COLUNAS_AGUA + dados.COLUNAS_LIXO)
+    for coluna in dict.fromkeys(indicadores):
+        valores = (rng.random(n) < rng.uniform(0.05, 0.9)).astype(np.float64)
+        valores[rng.random(n) < 0.02] = np.nan
+        bloco[coluna] = valores
+
+    # Matrículas por cor/raça: muitas escolas pequenas, poucas grandes; ~5% sem informação
+    porte = rng.lognormal(4, 1, n)
+    for coluna in dados.COLUNAS_RACA:
+        valores = rng.poisson(porte * rng.uniform(0.01, 0.4)).astype(np.float64)
+        valores[rng.random(n) < 0.05] = np.nan
+        bloco[coluna] = valores
+
+    for i in range(COLUNAS_EXTRAS):
+        bloco[f'QT_EXTRA_{i}'] = rng.integers(0, 50, n)
+    return pd.DataFrame(bloco)
+
+
+def gerar_microdados(linhas, caminho, semente=0):
+    """Grava um microdados.csv sintético com o formato do INEP (';', latin1)."""
+    rng = np.random.default_rng(semente)
+    tmp = caminho + ".tmp"
+    for inicio in range(0, linhas, LINHAS_POR_BLOCO):
+        bloco = gerar_bloco(min(LINHAS_POR_BLOCO, linhas - inicio), rng)
+        bloco.to_csv(tmp, sep=';', encoding='latin1', index=False,
+                     mode='w' if inicio == 0 else 'a', header=inicio == 0)
+    os.replace(tmp, caminho)
+    return caminho
+
+
+# -----------------------------
+# ⏱️ Cronômetro das etapas
+# -----------------------------
+class Medicoes:
+    def __init__(self, repeticoes=3):
+        self.repeticoes = repeticoes
+        self.etapas = {}
+
+    def medir(self, nome, funcao, repetir=True):
+        # Etapas baratas rodam várias vezes (fica a mediana); as caras, uma só
+        tempos, resultado = [], None
+        for _ in range(self.repeticoes if repetir else 1):
+            inicio = time.perf_counter()
+            resultado = funcao()
+            tempos.append(time.perf_counter() - inicio)
+        self.etapas[nome] = {"segundos": statistics.median(tempos), "execucoes": tempos}
+        return resultado
+
+
+def medir_tamanho(linhas, pasta, repeticoes=3, com_modelos=True):
+    csv = os.path.join(pasta, f"microdados-{linhas}.csv")
+    parquet = os.path.join(pasta, f"microdados-{linhas}.parquet")
+    m = Medicoes(repeticoes)
+
+    if not os.path.isfile(csv):
+        m.medir("gerar_csv", lambda: gerar_microdados(linhas, csv), repetir=False)
+
+    # Leitura do CSV, esquema compacto, Parquet, cubo e estatísticas de correlação (em lotes)
+    m.medir("csv_para_parquet", lambda: dados.ingerir_parquet(csv, parquet), repetir=False)
+    df = m.medir("leitura_parquet", lambda: dados.carregar_colunas(dados.COLUNAS_USADAS, parquet))
+    df = m.medir("rotulos", lambda: dados.mapear_rotulos(df.copy()))
+    base = dados.montar_base(parquet=parquet)
+    m.medir("indice_filtros", lambda: filtros.MotorFiltros(df, cubo.CHAVES + [c for _, c, _ in dados.FILTROS]))
+
+    # Filtro da barra lateral: nas células do cubo e nas linhas (bitmaps)
+    cubo_filtro = m.medir("filtro_cubo", lambda: cubo.filtrar(base.cubo, **SELECAO))
+    mascara = m.medir("filtro_linhas", lambda: base.filtros.mascara(**SELECAO))
+
+    def aba_dados_gerais():
+        cubo.contar(cubo_filtro, 'TP_LOCALIZACAO', dados.LOCALIZACOES)
+        cubo.contar(cubo_filtro, 'TP_DEPENDENCIA', dados.DEPENDENCIAS)
+        cubo.somar(base.cubo, dados.COLUNAS_RACA)
+
+    def aba_sustentabilidade():
+        cubo.contar(cubo_filtro, 'IN_ENERGIA_RENOVAVEL', dados.ENERGIAS)
+        cubo.contar(cubo.filtrar(base.cubo, IN_ENERGIA_RENOVAVEL=[1]), 'TP_DEPENDENCIA', dados.DEPENDENCIAS)
+        cubo.somar(cubo_filtro, dados.COLUNAS_AGUA)
+        cubo.somar(cubo_filtro, dados.COLUNAS_LIXO)
+
+    m.medir("aba_dados_gerais", aba_dados_gerais)
+    por_regiao = m.medir("aba_mapa", lambda: cubo.contar(cubo_filtro, 'NO_REGIAO'))
+    m.medir("aba_sustentabilidade", aba_sustentabilidade)
+    m.medir("correlacao", lambda: correlacao.matriz(cubo.filtrar(base.estatisticas, **SELECAO)))
+
+    # Backend DuckDB (consultas.py), quando instalado: o cubo e um filtro fora dele direto no Parquet
+    if importlib.util.find_spec("duckdb"):
+        m.medir("duckdb_cubo", lambda: consultas.montar_cubo([parquet]))
+        m.medir("duckdb_agua_com_internet",
+                lambda: consultas.somar([parquet], dados.COLUNAS_AGUA, IN_INTERNET=[1], **SELECAO))
+
+    # Mapa das regiões sem o LRU (o primeiro acesso inclui ler e simplificar o GeoJSON)
+    contagens = mapa.contagens_por_regiao(por_regiao)
+    m.medir("mapa_regioes", lambda: mapa.html_do_mapa.__wrapped__(contagens))
+    escolas = m.medir("pontos_indice", lambda: pontos.PontosEscolas(*pontos.coordenadas_das_escolas(df)),
+                      repetir=False)
+    m.medir("pontos_zoom_4", lambda: escolas.visiveis(4, mascara))
+
+    if com_modelos:
+        linhas_modelo = base.filtros.mascara(TP_DEPENDENCIA=modelos.CLASSES)
+        X, y = m.medir("modelo_atributos",
+                       lambda: modelos.extrair_atributos(df, dados.COLUNAS_MODELO, linhas_modelo))
+        for algoritmo, (_, parametros) in modelos.ALGORITMOS.items():
+            nome = "knn" if "KNN" in algoritmo else "random_forest"
+            resultado = m.medir(f"{nome}_total", lambda: modelos.treinar(X, y, algoritmo, parametros),
+                                repetir=False)
+            m.etapas[f"{nome}_treino"] = {"segundos": resultado["tempo_treino"]}
+            m.etapas[f"{nome}_previsao"] = {"segundos": resultado["tempo_previsao"]}
+
+    return {
+        "linhas": linhas,
+        "csv_mb": os.path.getsize(csv) / 2**20,
+        "parquet_mb": os.path.getsize(parquet) / 2**20,
+        "memoria_base_mb": df.memory_usage(deep=True).sum() / 2**20,
+        "etapas": m.etapas,
+    }
+
+
+def ambiente():
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "maquina": platform.node(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "cpus": os.cpu_count(),
+        "memoria_ingestao_mb": dados.MEMORIA_INGESTAO_MB,
+        "n_jobs": modelos.N_JOBS_PADRAO,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dos dashboards com microdados sintéticos")
+    parser.add_argument("linhas", nargs="*", type=int, default=TAMANHOS)
+    parser.add_argument("--saida", default=f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json")
+    parser.add_argument("--pasta", help="onde guardar os CSVs gerados (padrão: pasta temporária)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--sem-modelos", action="store_true")
+    parser.add_argument("--max-linhas-modelos", type=int, default=MAX_LINHAS_MODELOS,
+                        help="não treina os modelos acima desse número de linhas (0 = sem limite)")
+    args = parser.parse_args()
+
+    resultado = {"ambiente": ambiente(), "tamanhos": []}
+    with tempfile.TemporaryDirectory() as temporaria:
+        pasta = args.pasta or temporaria
+        os.makedirs(pasta, exist_ok=True)
+        for linhas in args.linhas:
+            com_modelos = not args.sem_modelos and (not args.max_linhas_modelos or linhas <= args.max_linhas_modelos)
+            medicao = medir_tamanho(linhas, pasta, args.repeticoes, com_modelos)
+            medicao["com_modelos"] = com_modelos
+            resultado["tamanhos"].append(medicao)
+            print(f"== {linhas} linhas" + ("" if com_modelos else " (sem modelos)"))
+            for nome, etapa in medicao["etapas"].items():
+                print(f"  {nome:<24} {etapa['segundos'] * 1000:10.1f} ms")
+
+            # Grava a cada tamanho: uma execução interrompida ainda deixa os anteriores
+            with open(args.saida, "w", encoding="utf-8") as f:
+                json.dump(resultado, f, indent=2)
+    print(f"Resultados em {args.saida}")
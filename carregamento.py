@@ -0,0 +1,77 @@
+# -----------------------------
+# 📁 Carga dos dados e barra lateral (comum aos dois apps)
+# -----------------------------
+# Os dois dashboards baixam, convertem e montam as mesmas partições por ano e
+# têm a mesma barra lateral (anos e os filtros de dados.FILTROS). Cada script
+# só diz quais colunas a base precisa.
+
+import streamlit as st
+
+import cubo
+import dados
+import filtros
+
+
+# Baixar só uma vez por processo e por ano: o manifesto (tamanho/sha256/ETag) diz
+# se a cópia local ainda vale, e o st.cache_resource evita repetir a checagem a cada rerun
+@st.cache_resource(show_spinner="Baixando microdados do INEP...")
+def obter_microdados(ano):
+    return dados.baixar_ano(ano)
+
+
+# Converter o CSV de cada ano para Parquet uma única vez (só com as colunas usadas)
+@st.cache_resource(show_spinner="Preparando o cache colunar...")
+def obter_parquet(ano, csv):
+    return dados.garantir_parquet(csv, dados.particao(ano).parquet)
+
+
+# Uma única base por ano e por processo, já com as colunas de rótulo (Dependência,
+# Localização, Energia); todas as sessões leem o mesmo objeto, sem copiar.
+# O medidor (fora da chave do cache) só vê as etapas internas quando a base é montada
+@st.cache_resource(show_spinner="Montando a base de dados...")
+def obter_base(parquet, colunas, _medidor=None):
+    return dados.montar_base(list(colunas), parquet, medidor=_medidor)
+
+
+def escolher_anos():
+    # Só as partições dos anos escolhidos são baixadas e lidas
+    anos_disponiveis = dados.anos_disponiveis()
+    anos = sorted(st.sidebar.multiselect("Ano", options=anos_disponiveis, default=anos_disponiveis[-1:]))
+    if not anos:
+        st.warning("⚠️ Escolha ao menos um ano.")
+        st.stop()
+    return anos
+
+
+def carregar_bases(anos, colunas, medidor):
+    """Base de cada ano escolhido ({ano: base}), com o tempo de cada etapa no medidor."""
+    with medidor.etapa("download"):
+        csvs = {ano: obter_microdados(ano) for ano in anos}
+    with medidor.etapa("parquet"):
+        parquets = {ano: obter_parquet(ano, csvs[ano]) for ano in anos}
+    # Só na primeira execução do processo: base/leitura (Parquet), base/rotulos
+    # (mapear_rotulos) e base/agregados (cubo, bitmaps e correlação), ver dados.montar_base
+    with medidor.etapa("base"):
+        return {ano: obter_base(parquets[ano], tuple(colunas), medidor) for ano in anos}
+
+
+def combinar_anos(bases):
+    # Cubo dos anos escolhidos: soma célula a célula dos cubos de cada partição
+    cubos = [b.cubo for b in bases.values()]
+    return cubo.combinar(cubos) if len(cubos) > 1 else cubos[0]
+
+
+def escolher_filtros(cubo_anos):
+    """(seleção, todas as opções), ambas coluna -> códigos do INEP, dos filtros de dados.FILTROS.
+
+    A seleção vale tanto para o cubo (células) quanto para o motor de filtros
+    (bitmaps das linhas), sem copiar a base.
+    """
+    selecao = {}
+    todas_as_opcoes = {}
+    for titulo, coluna, nomes in dados.FILTROS:
+        opcoes = filtros.opcoes_do_filtro(cubo_anos, coluna, nomes)
+        escolhidos = st.sidebar.multiselect(titulo, options=opcoes, default=opcoes)
+        selecao[coluna] = filtros.selecao_para_codigos(escolhidos, nomes)
+        todas_as_opcoes[coluna] = filtros.selecao_para_codigos(opcoes, nomes)
+    return selecao, todas_as_opcoes
@@ -0,0 +1,103 @@
+# -----------------------------
+# 🦆 Consultas SQL direto no Parquet (DuckDB, opcional)
+# -----------------------------
+# Com CENSO_BACKEND=duckdb, as contagens e somas são pedidas ao DuckDB, que lê
+# os arquivos Parquet das partições (censo/ano=AAAA/microdados.parquet) sem
+# carregá-los no pandas: só as colunas da consulta são lidas, os filtros descem
+# para a leitura (WHERE) e a agregação é vetorizada e usa todos os núcleos.
+# Vários anos viram uma única consulta sobre todos os arquivos, e um filtro
+# novo, mesmo numa coluna fora do cubo, não precisa da base na memória.
+#
+# O duckdb só é importado quando o backend é usado; sem ele (o padrão, pandas)
+# nada muda e o pacote nem precisa estar instalado.
+
+import os
+import threading
+
+import cubo
+import dados
+
+BACKEND = os.environ.get("CENSO_BACKEND", "pandas")
+
+_local = threading.local()
+
+
+def usar_duckdb():
+    return BACKEND == "duckdb"
+
+
+def conexao():
+    # Uma conexão por thread (o Streamlit e a API atendem sessões em threads diferentes)
+    if not hasattr(_local, "conexao"):
+        import duckdb  # opcional: pip install duckdb
+        _local.conexao = duckdb.connect()
+    return _local.conexao
+
+
+def origem(parquets):
+    arquivos = ", ".join("'" + p.replace("'", "''") + "'" for p in parquets)
+    # union_by_name: um ano sem alguma coluna entra com ela nula
+    return f"read_parquet([{arquivos}], union_by_name = true, hive_partitioning = false)"
+
+
+def colunas_dos_arquivos(parquets):
+    return list(dict.fromkeys(c for p in parquets for c in dados.colunas_do_parquet(p)))
+
+
+def condicoes(filtros, colunas):
+    # filtros: coluna -> valores aceitos (None = sem filtro), como em cubo.filtrar
+    partes, parametros = [], []
+    for coluna, aceitos in filtros.items():
+        if aceitos is None:
+            continue
+        if coluna not in colunas:
+            raise KeyError(coluna)
+        if not aceitos:
+            partes.append("FALSE")
+            continue
+        partes.append(f'"{coluna}" IN ({", ".join("?" * len(aceitos))})')
+        parametros.extend(aceitos)
+    return (" WHERE " + " AND ".join(partes) if partes else ""), parametros
+
+
+def consultar(sql, parametros=()):
+    return conexao().execute(sql, list(parametros)).df()
+
+
+def montar_cubo(parquets, colunas_soma=dados.COLUNAS_CUBO, **filtros):
+    """Mesmo cubo de cubo.montar_cubo (e de cubo.combinar dos anos), agrupado direto nos arquivos.
+
+    filtros podem usar qualquer coluna dos arquivos, não só as chaves do cubo.
+    """
+    colunas = colunas_dos_arquivos(parquets)
+    somas = [c for c in colunas_soma if c in colunas]
+    chaves = ", ".join(f'"{c}"' for c in cubo.CHAVES)
+    # Soma de uma célula sem nenhum valor é 0, como no pandas
+    agregados = "".join(f', COALESCE(SUM("{c}"), 0) AS "{c}"' for c in somas)
+    onde, parametros = condicoes(filtros, colunas)
+    df = consultar(
+        f"SELECT {chaves}{agregados}, COUNT(*) AS escolas FROM {origem(parquets)}{onde} GROUP BY {chaves}",
+        parametros,
+    )
+
+    # Mesmos tipos do cubo montado no pandas (chaves com nulos viriam como float)
+    for coluna in ['TP_DEPENDENCIA', 'TP_LOCALIZACAO']:
+        df[coluna] = df[coluna].astype('Int8' if df[coluna].isna().any() else 'int8')
+    df['IN_ENERGIA_RENOVAVEL'] = df['IN_ENERGIA_RENOVAVEL'].astype('Int8')
+    for coluna in somas:
+        df[coluna] = df[coluna].astype('Int64')
+    df['escolas'] = df['escolas'].astype('int64')
+    return dados.restaurar_tipos(df)
+
+
+def somar(parquets, colunas, **filtros):
+    """Soma de cada coluna (como cubo.somar), com os filtros aplicados na leitura."""
+    existentes = colunas_dos_arquivos(parquets)
+    onde, parametros = condicoes(filtros, existentes)
+    colunas = [c for c in colunas if c in existentes]
+    df = consultar(
+        "SELECT " + ", ".join(f'COALESCE(SUM("{c}"), 0) AS "{c}"' for c in colunas)
+        + f" FROM {origem(parquets)}{onde}",
+        parametros,
+    )
+    return df.iloc[0].astype('int64')
@@ -0,0 +1,76 @@
+# -----------------------------
+# 🔄 Correlação a partir de estatísticas suficientes
+# -----------------------------
+# A correlação de Pearson entre duas colunas só depende de cinco somas sobre as
+# linhas em que as duas estão preenchidas: n, Σx, Σy, Σx², Σy² e Σxy. Essas somas
+# são guardadas por célula do cubo (mesmas chaves de cubo.py), calculadas uma vez
+# na ingestão (lote a lote). A matriz para qualquer filtro é só a soma das
+# células selecionadas, sem voltar às linhas da base.
+#
+# Por célula, com X0 = valores (faltantes = 0) e M = 1 onde há valor:
+#   N = MᵀM     escolas com as duas colunas preenchidas
+#   S = X0ᵀM    S[i, j] = Σ x_i nas linhas em que j também está preenchida
+#   Q = (X0²)ᵀM  idem para x_i²
+#   P = X0ᵀX0   Σ x_i·x_j
+# Igual ao df.corr() do pandas (exclusão par a par dos faltantes).
+
+import numpy as np
+import pandas as pd
+
+import cubo
+
+ESTATISTICAS = ["N", "S", "Q", "P"]
+
+
+def nomes_das_colunas(colunas):
+    return [f"{e}:{a}:{b}" for e in ESTATISTICAS for a in colunas for b in colunas]
+
+
+def colunas_das_estatisticas(estatisticas):
+    # Colunas de dados cobertas por uma tabela de estatísticas (na ordem em que foram montadas)
+    return list(dict.fromkeys(c.split(":")[1] for c in estatisticas.columns if c.startswith("N:")))
+
+
+def montar_estatisticas(df, colunas):
+    """Uma linha por célula do cubo, com N, S, Q e P achatadas (colunas 'N:a:b' etc.)."""
+    colunas = [c for c in colunas if c in df.columns]
+    grupos = df.groupby([df[c] for c in cubo.CHAVES], observed=True, dropna=False)
+    codigos = grupos.ngroup().to_numpy()
+
+    X = np.column_stack([df[c].astype('float64').to_numpy(na_value=np.nan) for c in colunas])
+    preenchidos = ~np.isnan(X)
+    M = preenchidos.astype(np.float64)
+    X0 = np.where(preenchidos, X, 0.0)
+
+    # Linhas agrupadas por célula: cada célula é um intervalo contínuo de 'ordem'
+    ordem = np.argsort(codigos, kind='stable')
+    limites = np.searchsorted(codigos[ordem], np.arange(grupos.ngroups + 1))
+    linhas = []
+    for g in range(grupos.ngroups):
+        celula = ordem[limites[g]:limites[g + 1]]
+        m, x = M[celula], X0[celula]
+        linhas.append(np.concatenate([(m.T @ m).ravel(), (x.T @ m).ravel(),
+                                      ((x * x).T @ m).ravel(), (x.T @ x).ravel()]))
+
+    chaves = grupos.size().reset_index()[cubo.CHAVES]
+    nomes = nomes_das_colunas(colunas)
+    valores = pd.DataFrame(np.array(linhas).reshape(len(linhas), len(nomes)), columns=nomes)
+    return pd.concat([chaves, valores], axis=1)
+
+
+def matriz(estatisticas, colunas=None):
+    """Matriz de correlação das células recebidas (já filtradas com cubo.filtrar)."""
+    todas = colunas_das_estatisticas(estatisticas)
+    colunas = [c for c in (colunas or todas) if c in todas]
+    k = len(colunas)
+    totais = estatisticas[nomes_das_colunas(colunas)].sum().to_numpy(dtype=np.float64)
+    N, S, Q, P = totais.reshape(4, k, k)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        numerador = N * P - S * S.T
+        denominador = np.sqrt((N * Q - S ** 2) * (N * Q.T - S.T ** 2))
+        corr = numerador / denominador
+    # Menos de duas escolas ou coluna constante: indefinida, como no pandas
+    corr[(N < 2) | ~(denominador > 0)] = np.nan
+    np.clip(corr, -1, 1, out=corr)
+    return pd.DataFrame(corr, index=colunas, columns=colunas)
@@ -0,0 +1,60 @@
+# -----------------------------
+# 🧊 Cubo de agregados do Censo Escolar
+# -----------------------------
+# Todos os gráficos dos dashboards são contagens ou somas sobre as escolas
+# filtradas. Em vez de varrer as ~225 mil linhas a cada rerun, o cubo guarda
+# uma linha por combinação de (dependência, localização, região, energia) com a
+# quantidade de escolas e a soma de cada indicador; os gráficos respondem a
+# partir dele, em tempo proporcional ao número de células (algumas dezenas).
+
+import numpy as np
+import pandas as pd
+
+CHAVES = ['TP_DEPENDENCIA', 'TP_LOCALIZACAO', 'NO_REGIAO', 'IN_ENERGIA_RENOVAVEL']
+
+
+def montar_cubo(df, colunas_soma):
+    somas = [c for c in colunas_soma if c in df.columns]
+    # Int64 antes de agrupar: a soma por grupo mantém o tipo da coluna e estouraria no Int8/UInt8
+    valores = df[somas].astype('Int64')
+    grupos = valores.groupby([df[c] for c in CHAVES], observed=True, dropna=False)
+
+    cubo = grupos.sum()
+    cubo['escolas'] = grupos.size()
+    return cubo.reset_index()
+
+
+def combinar(cubos):
+    # Junta cubos de partes da base (p.ex. lotes da ingestão): soma célula a célula
+    juntos = pd.concat(cubos, ignore_index=True)
+    return juntos.groupby(CHAVES, observed=True, dropna=False).sum().reset_index()
+
+
+def por_particao(cubos, funcao):
+    # Uma linha por partição (p.ex. por ano): funcao(cubo) -> Series com as colunas.
+    # Cada partição já tem seu cubo, então a série histórica nunca junta as linhas brutas.
+    return pd.DataFrame({chave: funcao(c) for chave, c in cubos.items()}).T.fillna(0)
+
+
+def filtrar(cubo, **filtros):
+    # filtros: coluna-chave -> códigos aceitos (None = sem filtro nessa coluna)
+    mascara = np.ones(len(cubo), dtype=bool)
+    for coluna, valores in filtros.items():
+        if valores is not None:
+            mascara &= cubo[coluna].isin(valores).to_numpy()
+    return cubo[mascara]
+
+
+def contar(cubo, chave, rotulos=None):
+    # Escolas por valor da chave (equivale a value_counts na base filtrada);
+    # com rotulos, os códigos do índice viram os nomes mostrados nos gráficos
+    contagem = cubo.groupby(chave, observed=True)['escolas'].sum()
+    contagem = contagem[contagem > 0].sort_values(ascending=False)
+    if rotulos is not None:
+        contagem.index = [rotulos.get(v, v) for v in contagem.index]
+    return contagem
+
+
+def somar(cubo, colunas):
+    # Soma de cada coluna (equivale a df_filtro[colunas].sum())
+    return cubo[colunas].sum().astype('int64')
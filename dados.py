@@ -0,0 +1,597 @@
+# -----------------------------
+# 📦 Camada de dados do Censo Escolar
+# -----------------------------
+# Centraliza o download dos microdados do INEP para que os dois dashboards
+# (app.py e "app machine learning.py") compartilhem a mesma cópia local.
+
+import contextlib
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+
+import gdown  # precisa estar no requirements.txt
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
+
+import correlacao
+import cubo
+import filtros
+
+# ID do arquivo no Google Drive (Censo Escolar 2022)
+FILE_ID = "18sfTL_N1xRqunmsO77aAt1wfI0qbz3I5"
+URL = f"https://drive.google.com/uc?id={FILE_ID}"
+
+# Microdados de cada ano: ano -> ID do arquivo no Google Drive. Um ano novo é só
+# mais uma linha aqui (ou uma pasta censo/ano=AAAA com o microdados.csv já baixado).
+FONTES = {
+    2022: FILE_ID,
+}
+
+# Recortes de um DataFrame compartilhado nunca escrevem no original
+# (padrão a partir do pandas 3; nas versões 2.x precisa ser ligado)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+ARQUIVO_CSV = "microdados.csv"
+ARQUIVO_MANIFESTO = "microdados.manifest.json"
+ARQUIVO_PARQUET = "microdados.parquet"
+
+# Cada ano fica na sua partição: censo/ano=AAAA/{microdados.csv, manifesto, Parquet, cubo}
+PASTA_PARTICOES = "censo"
+
+# -----------------------------
+# 🧩 Colunas usadas pelos dashboards
+# -----------------------------
+COLUNAS_AGUA = [
+    'IN_AGUA_POTAVEL', 'IN_AGUA_REDE_PUBLICA', 'IN_AGUA_POCO_ARTESIANO',
+    'IN_AGUA_CACIMBA', 'IN_AGUA_FONTE_RIO', 'IN_AGUA_INEXISTENTE'
+]
+COLUNAS_LIXO = [
+    'IN_TRATAMENTO_LIXO_SEPARACAO', 'IN_TRATAMENTO_LIXO_REUTILIZA',
+    'IN_TRATAMENTO_LIXO_RECICLAGEM', 'IN_TRATAMENTO_LIXO_INEXISTENTE'
+]
+COLUNAS_RACA = [
+    'QT_MAT_BAS_ND', 'QT_MAT_BAS_BRANCA', 'QT_MAT_BAS_PRETA',
+    'QT_MAT_BAS_PARDA', 'QT_MAT_BAS_AMARELA', 'QT_MAT_BAS_INDIGENA'
+]
+COLUNAS_MODELO = [
+    'TP_DEPENDENCIA', 'TP_LOCALIZACAO',
+    'IN_BIBLIOTECA', 'IN_LABORATORIO_INFORMATICA',
+    'IN_INTERNET', 'IN_AGUA_POTAVEL', 'IN_AGUA_REDE_PUBLICA',
+    'IN_AGUA_POCO_ARTESIANO', 'IN_AGUA_CACIMBA',
+    'IN_AGUA_FONTE_RIO', 'IN_AGUA_INEXISTENTE'
+]
+COLUNAS_BASE = ['TP_DEPENDENCIA', 'TP_LOCALIZACAO', 'NO_REGIAO', 'IN_ENERGIA_RENOVAVEL']
+# Localização de cada escola para o mapa de pontos (ver pontos.py); as que não
+# existirem no CSV do ano simplesmente ficam de fora
+COLUNAS_COORDENADAS = ['NU_LATITUDE', 'NU_LONGITUDE', 'CO_MUNICIPIO']
+
+# Rótulos usados nos gráficos e filtros
+DEPENDENCIAS = {1: 'Federal', 2: 'Estadual', 3: 'Municipal', 4: 'Privada'}
+LOCALIZACOES = {1: 'Urbana', 2: 'Rural'}
+ENERGIAS = {1: 'Com Renovável', 0: 'Sem Renovável'}
+
+# Tabela fixa de códigos das regiões (mesmas chaves de coordenadas_regioes e do GeoJSON)
+REGIOES = ["NORTE", "NORDESTE", "CENTRO-OESTE", "SUDESTE", "SUL"]
+
+
+# Filtros da barra lateral: (título, coluna com o código do INEP, nomes dos códigos).
+# Os gráficos filtram as células do cubo, não as linhas, então a coluna precisa
+# ser uma chave do cubo (cubo.CHAVES): região, localização ou energia renovável
+# são só mais uma linha aqui (nomes None mostra os próprios valores). Um filtro
+# em outra coluna (p.ex. SG_UF) exige incluí-la em cubo.CHAVES e em COLUNAS_USADAS.
+FILTROS = [
+    ("Tipo de Escola", 'TP_DEPENDENCIA', DEPENDENCIAS),
+]
+
+# Colunas somadas no cubo de agregados
+COLUNAS_CUBO = COLUNAS_AGUA + COLUNAS_LIXO + COLUNAS_RACA
+
+# Colunas com estatísticas de correlação por célula do cubo (ver correlacao.py)
+COLUNAS_CORRELACAO = ['IN_ENERGIA_RENOVAVEL', 'TP_DEPENDENCIA'] + COLUNAS_AGUA + COLUNAS_LIXO
+
+# Tudo o que algum dashboard lê; o resto das centenas de colunas do CSV fica de fora do Parquet
+COLUNAS_USADAS = list(dict.fromkeys(
+    COLUNAS_BASE + COLUNAS_AGUA + COLUNAS_LIXO + COLUNAS_RACA + COLUNAS_MODELO + COLUNAS_COORDENADAS
+))
+
+
+# -----------------------------
+# 🧾 Manifesto da cópia local
+# -----------------------------
+def calcular_sha256(caminho, bloco=1 << 20):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for parte in iter(lambda: f.read(bloco), b""):
+            h.update(parte)
+    return h.hexdigest()
+
+
+def ler_manifesto(caminho=ARQUIVO_MANIFESTO):
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def gravar_manifesto(manifesto, caminho=ARQUIVO_MANIFESTO):
+    # Grava em arquivo temporário e renomeia, para nunca deixar um manifesto pela metade
+    tmp = caminho + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, indent=2)
+    os.replace(tmp, caminho)
+
+
+def url_do_arquivo(file_id=FILE_ID):
+    return f"https://drive.google.com/uc?id={file_id}"
+
+
+def consultar_remoto(url=URL, timeout=10):
+    # HEAD no Drive: devolve ETag e tamanho, quando o servidor informa
+    try:
+        resp = requests.head(url, allow_redirects=True, timeout=timeout)
+    except requests.RequestException:
+        return {}
+    if not resp.ok:
+        return {}
+    tamanho = resp.headers.get("Content-Length")
+    return {
+        "etag": resp.headers.get("ETag"),
+        "tamanho": int(tamanho) if tamanho and tamanho.isdigit() else None,
+    }
+
+
+def copia_local_valida(saida=ARQUIVO_CSV, manifesto=None, verificar_hash=False, file_id=FILE_ID):
+    # A cópia local vale enquanto bater com o manifesto (mesmo arquivo de origem e mesmo tamanho)
+    if manifesto is None or not os.path.isfile(saida):
+        return False
+    if manifesto.get("file_id") != file_id:
+        return False
+    if os.path.getsize(saida) != manifesto.get("tamanho"):
+        return False
+    if verificar_hash and calcular_sha256(saida) != manifesto.get("sha256"):
+        return False
+    return True
+
+
+def remoto_mudou(manifesto, url=URL):
+    # Só considera desatualizado quando o servidor informa algo diferente do manifesto
+    remoto = consultar_remoto(url)
+    if remoto.get("etag") and manifesto.get("etag") and remoto["etag"] != manifesto["etag"]:
+        return True
+    if remoto.get("tamanho") and remoto["tamanho"] != manifesto.get("tamanho"):
+        return True
+    return False
+
+
+# -----------------------------
+# ⬇️ Download condicional
+# -----------------------------
+def baixar_microdados(saida=ARQUIVO_CSV, manifesto_path=ARQUIVO_MANIFESTO,
+                      revalidar=False, verificar_hash=False, quiet=False, file_id=FILE_ID):
+    """Garante uma cópia local de microdados.csv e devolve o caminho.
+
+    Só acessa a rede quando a cópia não existe, não bate com o manifesto ou,
+    com revalidar=True, quando o ETag/tamanho remoto mudou.
+    """
+    url = url_do_arquivo(file_id)
+    manifesto = ler_manifesto(manifesto_path)
+
+    # Cópia baixada antes do manifesto existir: o gdown só move o arquivo para o
+    # destino quando termina, então ela está completa e pode ser adotada.
+    if manifesto is None and os.path.isfile(saida):
+        manifesto = {
+            "file_id": file_id,
+            "url": url,
+            "tamanho": os.path.getsize(saida),
+            "sha256": calcular_sha256(saida),
+            "etag": None,
+            "baixado_em": None,
+        }
+        gravar_manifesto(manifesto, manifesto_path)
+
+    if copia_local_valida(saida, manifesto, verificar_hash, file_id):
+        if not revalidar or not remoto_mudou(manifesto, url):
+            return saida
+
+    # Cópia inválida ou desatualizada: tira do caminho para o gdown não pular o download.
+    # Um download interrompido fica no arquivo parcial do gdown e é retomado (resume=True).
+    if os.path.isfile(saida):
+        os.remove(saida)
+
+    remoto = consultar_remoto(url)
+    gdown.download(url, saida, quiet=quiet, resume=True)
+
+    gravar_manifesto({
+        "file_id": file_id,
+        "url": url,
+        "tamanho": os.path.getsize(saida),
+        "sha256": calcular_sha256(saida),
+        "etag": remoto.get("etag"),
+        "baixado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }, manifesto_path)
+    return saida
+
+
+# -----------------------------
+# 🗜️ Cache colunar (Parquet)
+# -----------------------------
+def colunas_do_csv(csv=ARQUIVO_CSV):
+    # Só o cabeçalho: nrows=0 não lê nenhuma linha de dados
+    return list(pd.read_csv(csv, sep=';', encoding='latin1', nrows=0).columns)
+
+
+def colunas_do_parquet(parquet=ARQUIVO_PARQUET):
+    return pq.read_schema(parquet).names
+
+
+def parquet_atualizado(csv=ARQUIVO_CSV, parquet=ARQUIVO_PARQUET, colunas=COLUNAS_USADAS):
+    if not os.path.isfile(parquet):
+        return False
+    metadados = pq.read_schema(parquet).metadata or {}
+    if metadados.get(b'censo_esquema') != VERSAO_ESQUEMA.encode():
+        return False
+    if os.path.isfile(csv) and os.path.getmtime(parquet) < os.path.getmtime(csv):
+        return False
+    # Se alguma coluna nova passou a ser usada (e existe no CSV), precisa reingerir
+    faltando = set(colunas) - set(colunas_do_parquet(parquet))
+    return not (os.path.isfile(csv) and faltando & set(colunas_do_csv(csv)))
+
+
+# -----------------------------
+# 📐 Esquema de tipos compactos
+# -----------------------------
+# IN_* são indicadores 0/1 (com faltantes), TP_* são códigos pequenos e
+# QT_* são contagens. Lidos com os tipos padrão do read_csv, viram int64/float64
+# e objetos de texto; com o esquema abaixo cada linha ocupa poucos bytes.
+
+# Sobe sempre que o esquema mudar, para o Parquet antigo ser reingerido
+VERSAO_ESQUEMA = "2"
+
+INTEIROS_SEM_SINAL = [('UInt8', 2**8 - 1), ('UInt16', 2**16 - 1), ('UInt32', 2**32 - 1)]
+
+
+def tipo_na_leitura(coluna):
+    # Tipo passado ao read_csv (já evita montar colunas int64/float64 inteiras)
+    if coluna.startswith(('IN_', 'TP_')):
+        return 'Int8'
+    if coluna.startswith('QT_'):
+        return 'Int64'
+    if coluna == 'NO_REGIAO':
+        return 'category'
+    return None
+
+
+def tipo_para_contagem(minimo, maximo):
+    # Menor inteiro sem sinal (nulável) que comporta o maior valor da contagem
+    if minimo is not pd.NA and minimo < 0:
+        return 'Int64'
+    for tipo, limite in INTEIROS_SEM_SINAL:
+        if maximo is pd.NA or maximo <= limite:
+            return tipo
+    return 'UInt64'
+
+
+def menor_inteiro_nulavel(serie):
+    return tipo_para_contagem(serie.min(), serie.max())
+
+
+def normalizar_regiao(serie):
+    # strip/upper só nas categorias lidas (meia dúzia de textos), não nas linhas;
+    # o resultado usa sempre a tabela REGIOES, e o que não casar vira faltante
+    serie = serie.astype('category')
+    normalizadas = serie.cat.categories.astype(str).str.strip().str.upper()
+    tabela = np.array([REGIOES.index(c) if c in REGIOES else -1 for c in normalizadas] + [-1], dtype=np.int8)
+    codigos = tabela[serie.cat.codes.to_numpy()]  # o código -1 (faltante) cai no último item
+    return pd.Series(pd.Categorical.from_codes(codigos, categories=REGIOES), index=serie.index, name=serie.name)
+
+
+def aplicar_esquema(df, tipos_qt=None):
+    # tipos_qt: tipos das contagens já decididos (na ingestão em lotes vêm do arquivo inteiro)
+    if 'NO_REGIAO' in df.columns:
+        df['NO_REGIAO'] = normalizar_regiao(df['NO_REGIAO'])
+    for coluna in df.columns:
+        if coluna.startswith('TP_'):
+            df[coluna] = df[coluna].astype('category')
+        elif coluna.startswith('QT_'):
+            tipo = (tipos_qt or {}).get(coluna) or menor_inteiro_nulavel(df[coluna])
+            df[coluna] = df[coluna].astype(tipo)
+    return df
+
+
+def validar_esquema(df):
+    erros = []
+    for coluna in df.columns:
+        tipo = df[coluna].dtype
+        if coluna.startswith('IN_') and str(tipo) not in ('Int8', 'int8', 'bool'):
+            erros.append(f"{coluna}: {tipo} (esperado Int8)")
+        elif (coluna.startswith('TP_') or coluna == 'NO_REGIAO') and not isinstance(tipo, pd.CategoricalDtype):
+            erros.append(f"{coluna}: {tipo} (esperado category)")
+        elif coluna.startswith('QT_') and str(tipo) not in [t for t, _ in INTEIROS_SEM_SINAL] + ['UInt64', 'Int64']:
+            erros.append(f"{coluna}: {tipo} (esperado inteiro nulável)")
+    if erros:
+        raise ValueError("Colunas fora do esquema: " + "; ".join(erros))
+
+
+def relatorio_memoria(df):
+    """Memória ocupada por coluna (em bytes, contando os textos), da maior para a menor."""
+    uso = df.memory_usage(deep=True, index=False)
+    relatorio = pd.DataFrame({
+        'tipo': df.dtypes.astype(str),
+        'bytes': uso,
+        'bytes_por_linha': (uso / max(len(df), 1)).round(2),
+    })
+    return relatorio.sort_values('bytes', ascending=False)
+
+
+# -----------------------------
+# 🚰 Ingestão em lotes (memória limitada)
+# -----------------------------
+# O CSV é lido em lotes de tamanho fixo; cada lote passa pela seleção de
+# colunas, pelo esquema e pela normalização e é anexado ao Parquet, e o cubo de
+# agregados é acumulado lote a lote. O pico de memória fica perto do orçamento
+# abaixo, e não um múltiplo do tamanho do arquivo. 0 = tudo de uma vez.
+MEMORIA_INGESTAO_MB = int(os.environ.get("CENSO_MEMORIA_INGESTAO_MB", "512"))
+
+
+def linhas_por_lote(csv, colunas, memoria_mb):
+    if not memoria_mb:
+        return None
+    # Tamanho médio da linha estimado pelo primeiro MiB do arquivo
+    with open(csv, 'rb') as f:
+        amostra = f.read(1 << 20)
+    bytes_por_linha = len(amostra) / max(amostra.count(b'\n'), 1) + 16 * len(colunas)
+    # Margem de 3x: texto do lote, colunas em parse e a conversão para o esquema
+    return max(1000, int(memoria_mb * 2**20 / (3 * bytes_por_linha)))
+
+
+def lotes_do_csv(csv, linhas, **kwargs):
+    if linhas is None:
+        yield pd.read_csv(csv, sep=';', encoding='latin1', **kwargs)
+    else:
+        yield from pd.read_csv(csv, sep=';', encoding='latin1', chunksize=linhas, **kwargs)
+
+
+def tipos_das_contagens(csv, colunas, linhas):
+    # Primeira passada, só com as colunas QT_*: o menor inteiro que cabe depende do
+    # maior valor do arquivo inteiro, não do lote
+    contagens = [c for c in colunas_do_csv(csv) if c in set(colunas) and c.startswith('QT_')]
+    if not contagens:
+        return {}
+    minimos, maximos = {}, {}
+    for lote in lotes_do_csv(csv, linhas, usecols=contagens, dtype='Int64'):
+        for c in contagens:
+            for acumulado, valor, escolher in [(minimos, lote[c].min(), min), (maximos, lote[c].max(), max)]:
+                if valor is not pd.NA:
+                    acumulado[c] = escolher(acumulado.get(c, valor), valor)
+    return {c: tipo_para_contagem(minimos.get(c, pd.NA), maximos.get(c, pd.NA)) for c in contagens}
+
+
+def ingerir_parquet(csv=ARQUIVO_CSV, parquet=ARQUIVO_PARQUET, colunas=COLUNAS_USADAS,
+                    memoria_mb=MEMORIA_INGESTAO_MB):
+    """Converte microdados.csv em Parquet, guardando só as colunas usadas, já com o esquema compacto.
+
+    Também grava o cubo de agregados e as estatísticas de correlação por célula
+    (caminho_do_agregado), montados durante a mesma leitura.
+    """
+    usadas = set(colunas)
+    tipos = {c: tipo_na_leitura(c) for c in colunas if tipo_na_leitura(c)}
+    linhas = linhas_por_lote(csv, colunas, memoria_mb)
+    tipos_qt = tipos_das_contagens(csv, colunas, linhas) if linhas else None
+
+    # Com o backend DuckDB o cubo sai de uma consulta no Parquet já gravado, em vez de lote a lote
+    # (import aqui dentro: consultas.py importa este módulo)
+    import consultas
+    cubo_sql = consultas.usar_duckdb()
+
+    tmp = parquet + ".tmp"
+    escritor, cubo_total, estatisticas_total = None, None, None
+    try:
+        for lote in lotes_do_csv(csv, linhas, usecols=lambda c: c in usadas, dtype=tipos):
+            lote = aplicar_esquema(lote, tipos_qt)
+            validar_esquema(lote)
+
+            tabela = pa.Table.from_pandas(lote, preserve_index=False)
+            if escritor is None:
+                # A versão do esquema vai nos metadados do arquivo
+                metadados = dict(tabela.schema.metadata or {})
+                metadados[b'censo_esquema'] = VERSAO_ESQUEMA.encode()
+                escritor = pq.ParquetWriter(tmp, tabela.schema.with_metadata(metadados))
+            escritor.write_table(tabela)
+
+            if not cubo_sql:
+                parcial = cubo.montar_cubo(lote, COLUNAS_CUBO)
+                cubo_total = parcial if cubo_total is None else cubo.combinar([cubo_total, parcial])
+            parcial = correlacao.montar_estatisticas(lote, COLUNAS_CORRELACAO)
+            estatisticas_total = (parcial if estatisticas_total is None
+                                  else cubo.combinar([estatisticas_total, parcial]))
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+    os.replace(tmp, parquet)
+    if cubo_sql:
+        cubo_total = consultas.montar_cubo([parquet])
+    for tipo, agregado in [("cubo", cubo_total), ("corr", estatisticas_total)]:
+        caminho = caminho_do_agregado(parquet, tipo)
+        agregado.to_parquet(caminho + ".tmp", index=False)
+        os.replace(caminho + ".tmp", caminho)
+    return parquet
+
+
+def garantir_parquet(csv=ARQUIVO_CSV, parquet=ARQUIVO_PARQUET, colunas=COLUNAS_USADAS):
+    if not parquet_atualizado(csv, parquet, colunas):
+        ingerir_parquet(csv, parquet, colunas)
+    return parquet
+
+
+def caminho_do_agregado(parquet, tipo):
+    # Os agregados ficam ao lado do Parquet: microdados.parquet -> microdados.cubo.parquet
+    return os.path.splitext(parquet)[0] + f".{tipo}.parquet"
+
+
+def carregar_agregado(parquet, tipo, montar):
+    # Usa o agregado gravado na ingestão quando ele é tão novo quanto o Parquet;
+    # senão (Parquet de uma versão anterior) chama montar() a partir da base
+    caminho = caminho_do_agregado(parquet, tipo)
+    if os.path.isfile(caminho) and os.path.getmtime(caminho) >= os.path.getmtime(parquet):
+        return carregar_colunas(colunas_do_parquet(caminho), caminho)
+    return montar()
+
+
+def carregar_colunas(colunas, parquet=ARQUIVO_PARQUET):
+    # Lê do Parquet apenas as colunas pedidas (as que não existirem são ignoradas)
+    existentes = set(colunas_do_parquet(parquet))
+    df = pd.read_parquet(parquet, columns=[c for c in colunas if c in existentes])
+    return restaurar_tipos(df)
+
+
+def restaurar_tipos(df):
+    # O Parquet (e o DuckDB, ver consultas.py) devolve os códigos TP_* como inteiros;
+    # volta para categórico como no esquema
+    for coluna in df.columns:
+        if coluna.startswith('TP_') and not isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].astype('category')
+    if 'NO_REGIAO' in df.columns:
+        df['NO_REGIAO'] = pd.Categorical(df['NO_REGIAO'], categories=REGIOES)
+    return df
+
+
+# -----------------------------
+# 🏛️ Base compartilhada entre sessões
+# -----------------------------
+@dataclass(frozen=True)
+class BaseCenso:
+    """Base do censo montada uma vez por processo e só lida pelas sessões.
+
+    Quem precisar de outra forma dos dados filtra ou agrega a partir de df;
+    nunca escreve nele (com copy-on-write, uma escrita num recorte não o altera).
+    """
+    df: pd.DataFrame
+    cubo: pd.DataFrame
+    filtros: filtros.MotorFiltros
+    versao: str
+    estatisticas: pd.DataFrame  # estatísticas de correlação por célula do cubo
+
+
+def versao_dos_dados(manifesto_path=None, parquet=ARQUIVO_PARQUET):
+    # Identifica a cópia dos dados para chaves de cache (sha256 do CSV, ou mtime do Parquet)
+    if manifesto_path is None:
+        manifesto_path = os.path.join(os.path.dirname(parquet), ARQUIVO_MANIFESTO)
+    manifesto = ler_manifesto(manifesto_path)
+    if manifesto and manifesto.get("sha256"):
+        return manifesto["sha256"][:12]
+    return str(int(os.path.getmtime(parquet)))
+
+
+def mapear_rotulos(df):
+    # Rótulos como categóricos: um código de 1 byte por linha em vez de um texto
+    for rotulo, coluna, mapa in [('Dependência', 'TP_DEPENDENCIA', DEPENDENCIAS),
+                                 ('Localização', 'TP_LOCALIZACAO', LOCALIZACOES),
+                                 ('Energia', 'IN_ENERGIA_RENOVAVEL', ENERGIAS)]:
+        df[rotulo] = df[coluna].map(mapa).astype(pd.CategoricalDtype(list(mapa.values())))
+    return df
+
+
+def montar_base(colunas=COLUNAS_USADAS, parquet=ARQUIVO_PARQUET, medidor=None):
+    # Com um medidor (instrumentacao.py), leitura, rótulos e agregados viram etapas separadas
+    def etapa(nome):
+        return medidor.etapa(nome) if medidor else contextlib.nullcontext()
+
+    with etapa("leitura"):
+        df = carregar_colunas(colunas, parquet)
+    with etapa("rotulos"):
+        df = mapear_rotulos(df)
+    with etapa("agregados"):
+        return BaseCenso(
+            df=df,
+            cubo=carregar_agregado(parquet, "cubo", lambda: cubo.montar_cubo(df, COLUNAS_CUBO)),
+            filtros=filtros.MotorFiltros(df, cubo.CHAVES + [c for _, c, _ in FILTROS]),
+            versao=versao_dos_dados(parquet=parquet),
+            estatisticas=carregar_agregado(
+                parquet, "corr", lambda: correlacao.montar_estatisticas(df, COLUNAS_CORRELACAO)
+            ),
+        )
+
+
+# -----------------------------
+# 📅 Partições por ano
+# -----------------------------
+# Cada ano é uma partição independente (download, manifesto, Parquet e cubo
+# próprios). Os dashboards só leem as partições dos anos escolhidos, e as
+# comparações entre anos saem dos cubos de cada partição, sem juntar as linhas.
+@dataclass(frozen=True)
+class Particao:
+    ano: int
+    csv: str
+    manifesto: str
+    parquet: str
+
+
+def particao(ano, pasta=PASTA_PARTICOES):
+    raiz = os.path.join(pasta, f"ano={ano}")
+    return Particao(
+        ano=int(ano),
+        csv=os.path.join(raiz, ARQUIVO_CSV),
+        manifesto=os.path.join(raiz, ARQUIVO_MANIFESTO),
+        parquet=os.path.join(raiz, ARQUIVO_PARQUET),
+    )
+
+
+def anos_disponiveis(pasta=PASTA_PARTICOES):
+    # Anos com fonte conhecida mais os que já têm partição no disco
+    anos = set(FONTES)
+    if os.path.isdir(pasta):
+        for nome in os.listdir(pasta):
+            chave, _, ano = nome.partition("=")
+            p = particao(ano, pasta) if chave == "ano" and ano.isdigit() else None
+            if p and (os.path.isfile(p.csv) or os.path.isfile(p.parquet)):
+                anos.add(p.ano)
+    return sorted(anos)
+
+
+def migrar_copia_antiga(p):
+    # Cópias de antes das partições ficavam na raiz do projeto: passam para a
+    # partição do ano de FILE_ID em vez de serem baixadas de novo
+    if FONTES.get(p.ano) != FILE_ID:
+        return
+    for antigo, novo in [(ARQUIVO_CSV, p.csv), (ARQUIVO_MANIFESTO, p.manifesto),
+                         (ARQUIVO_PARQUET, p.parquet),
+                         (caminho_do_agregado(ARQUIVO_PARQUET, "cubo"), caminho_do_agregado(p.parquet, "cubo")),
+                         (caminho_do_agregado(ARQUIVO_PARQUET, "corr"), caminho_do_agregado(p.parquet, "corr"))]:
+        if os.path.isfile(antigo) and not os.path.exists(novo):
+            os.replace(antigo, novo)
+
+
+def baixar_ano(ano, pasta=PASTA_PARTICOES, **kwargs):
+    """Garante o microdados.csv da partição do ano e devolve o caminho."""
+    p = particao(ano, pasta)
+    os.makedirs(os.path.dirname(p.csv), exist_ok=True)
+    migrar_copia_antiga(p)
+    if ano in FONTES:
+        return baixar_microdados(p.csv, p.manifesto, file_id=FONTES[ano], **kwargs)
+    if os.path.isfile(p.csv) or os.path.isfile(p.parquet):
+        return p.csv
+    raise FileNotFoundError(f"Sem fonte para {ano}: inclua o ID em FONTES ou coloque o CSV em {p.csv}")
+
+
+def garantir_ano(ano, colunas=COLUNAS_USADAS, pasta=PASTA_PARTICOES):
+    # Download + ingestão da partição; devolve o Parquet
+    p = particao(ano, pasta)
+    return garantir_parquet(baixar_ano(ano, pasta), p.parquet, colunas)
+
+
+if __name__ == "__main__":
+    # Ingestão manual: python dados.py [ano ...] (sem argumentos, todos os anos conhecidos)
+    import sys
+    for ano in [int(a) for a in sys.argv[1:]] or anos_disponiveis():
+        base = montar_base(parquet=garantir_ano(ano))
+        print(f"== {ano}")
+        print(relatorio_memoria(base.df).to_string())
+        print(f"Total: {base.df.memory_usage(deep=True).sum() / 2**20:.1f} MiB em {len(base.df)} linhas")
@@ -0,0 +1,369 @@
+# -----------------------------
+# 📊 Cache de figuras do Plotly
+# -----------------------------
+# Cada rerun remontava todas as figuras (px.pie, px.bar, px.imshow...) mesmo
+# com o filtro igual. Aqui cada gráfico é uma função registrada com
+# @graficos.figura(...) que recebe o recorte já filtrado e devolve a figura; a
+# spec pronta (dict do Plotly) fica num LRU compartilhado entre as sessões, com
+# chave (gráfico, estado do filtro, versão dos dados). Num acerto não há nem
+# agregação nem construção da figura. Como os filtros têm poucas combinações
+# (15 subconjuntos não vazios das 4 dependências), o cache pode ser aquecido
+# com todas elas na subida do app (CENSO_PREAQUECER_FIGURAS=1).
+#
+# Os gráficos dos dois dashboards são os mesmos: registrar_figuras() registra
+# todos e cada app só troca os títulos e as colunas da correlação.
+
+import itertools
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+import correlacao
+import cubo
+import dados
+import rotulos
+
+MAX_FIGURAS = int(os.environ.get("CENSO_MAX_FIGURAS", "256"))
+PREAQUECER = os.environ.get("CENSO_PREAQUECER_FIGURAS") == "1"
+
+# O que um gráfico pode usar, já filtrado: cubo dos anos escolhidos, estatísticas
+# de correlação (correlacao.py) e o cubo de cada ano (séries anuais)
+Recorte = namedtuple("Recorte", ["cubo", "estatisticas", "por_ano"])
+
+TITULOS = {
+    "localizacao": '📍 Localização das Escolas',
+    "dependencia": '🏩 Tipo de Dependência Administrativa',
+    "dependencia_anos": '📈 Escolas por Ano e Dependência',
+    "raca": '🌈 Matrículas na Educação Básica por Cor/Raça',
+    "energia": '⚡ Uso de Energia Renovável',
+    "energia_anos": '📈 Uso de Energia Renovável por Ano',
+    "energia_por_tipo": '✨ Escolas com Energia Renovável por Tipo de Dependência',
+    "agua": '🚰 Distribuição por Tipo de Abastecimento de Água',
+    "lixo": '♻️ Tipos de Tratamento de Lixo nas Escolas',
+    "correlacao": '🔄 Correlação: Água, Lixo, Energia Renovável e Tipo de Escola',
+}
+
+# Colunas de interesse da correlação (os nomes de exibição vêm de rotulos.py)
+COLUNAS_CORR = [
+    'IN_ENERGIA_RENOVAVEL',
+    'TP_DEPENDENCIA',
+    'IN_AGUA_POTAVEL', 'IN_AGUA_REDE_PUBLICA', 'IN_AGUA_POCO_ARTESIANO',
+    'IN_AGUA_CACIMBA', 'IN_AGUA_FONTE_RIO', 'IN_AGUA_INEXISTENTE',
+    'IN_TRATAMENTO_LIXO_SEPARACAO', 'IN_TRATAMENTO_LIXO_REUTILIZA',
+    'IN_TRATAMENTO_LIXO_RECICLAGEM', 'IN_TRATAMENTO_LIXO_INEXISTENTE'
+]
+
+
+class CacheFiguras:
+    """LRU de specs do Plotly, seguro para várias sessões ao mesmo tempo."""
+
+    def __init__(self, maximo=MAX_FIGURAS):
+        self.maximo = maximo
+        self.figuras = OrderedDict()
+        self.trava = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+
+    def obter(self, chave, montar):
+        with self.trava:
+            if chave in self.figuras:
+                self.figuras.move_to_end(chave)
+                self.acertos += 1
+                return self.figuras[chave]
+        # Monta fora da trava: duas sessões podem montar a mesma figura, mas nenhuma espera a outra
+        spec = montar().to_dict()
+        with self.trava:
+            self.faltas += 1
+            self.figuras[chave] = spec
+            self.figuras.move_to_end(chave)
+            while len(self.figuras) > self.maximo:
+                self.figuras.popitem(last=False)
+        return spec
+
+
+def estado_do_filtro(selecao):
+    # Seleção (coluna -> códigos aceitos) como chave hashável e independente da ordem
+    return tuple(sorted(
+        (coluna, None if aceitos is None else tuple(sorted(aceitos)))
+        for coluna, aceitos in selecao.items()
+    ))
+
+
+def selecoes_possiveis(opcoes):
+    # opcoes: coluna -> códigos; todas as combinações de subconjuntos não vazios
+    subconjuntos = [
+        [list(c) for n in range(1, len(codigos) + 1) for c in itertools.combinations(codigos, n)]
+        for codigos in opcoes.values()
+    ]
+    for combinacao in itertools.product(*subconjuntos):
+        yield dict(zip(opcoes, combinacao))
+
+
+class Graficos:
+    def __init__(self, cache, versao, recortar):
+        # recortar(selecao) -> Recorte; só é chamado quando alguma figura precisa ser montada
+        self.cache = cache
+        self.versao = versao
+        self.recortar = recortar
+        self.registro = {}
+        self.recortes = {}
+        self.selecao = {}
+        self.avisou_vazio = False
+
+    def figura(self, nome, filtrada=True):
+        # filtrada=False: a figura usa os anos escolhidos mas ignora o filtro da barra lateral
+        def registrar(montar):
+            self.registro[nome] = (montar, filtrada)
+            return montar
+        return registrar
+
+    def usar(self, selecao):
+        self.selecao = selecao
+
+    def recorte(self, selecao):
+        estado = estado_do_filtro(selecao)
+        if estado not in self.recortes:
+            self.recortes[estado] = self.recortar(selecao)
+        return self.recortes[estado]
+
+    def spec(self, nome, selecao=None):
+        montar, filtrada = self.registro[nome]
+        selecao = (self.selecao if selecao is None else selecao) if filtrada else {}
+        chave = (nome, estado_do_filtro(selecao), self.versao)
+        return self.cache.obter(chave, lambda: montar(self.recorte(selecao)))
+
+    def vazia(self):
+        # Algum filtro sem nenhum valor escolhido: nenhuma escola na seleção
+        return any(aceitos is not None and not len(aceitos) for aceitos in self.selecao.values())
+
+    def mostrar(self, nome):
+        if self.registro[nome][1] and self.vazia():
+            # Um aviso só no lugar dos gráficos filtrados (o px os montaria sem traços)
+            if not self.avisou_vazio:
+                st.info("ℹ️ Nenhuma escola com os filtros escolhidos.")
+                self.avisou_vazio = True
+            return
+        # O st.plotly_chart recusa um dict sem traços (p.ex. um ano sem escolas na
+        # seleção); como Figure ele passa, com a mesma validação que o dict teria
+        st.plotly_chart(go.Figure(self.spec(nome)), use_container_width=True)
+
+    def aquecer(self, opcoes):
+        # Monta todas as figuras filtradas para todas as seleções possíveis
+        for selecao in selecoes_possiveis(opcoes):
+            for nome, (_, filtrada) in self.registro.items():
+                if filtrada:
+                    self.spec(nome, selecao)
+        self.recortes.clear()
+
+
+# Specs compartilhadas entre as sessões de um app (um LRU por script)
+@st.cache_resource
+def obter_cache(app):
+    return CacheFiguras()
+
+
+def recortador(bases, cubo_anos):
+    """recortar(selecao) -> Recorte dos anos escolhidos; só é chamado quando falta alguma figura no cache."""
+    def recortar(sel):
+        estatisticas = [b.estatisticas for b in bases.values()]
+        estatisticas = cubo.combinar(estatisticas) if len(estatisticas) > 1 else estatisticas[0]
+        return Recorte(
+            cubo=cubo.filtrar(cubo_anos, **sel),
+            # Correlação a partir das estatísticas por célula (correlacao.py), sem voltar às linhas da base
+            estatisticas=cubo.filtrar(estatisticas, **sel),
+            # A mesma seleção no cubo de cada ano, para as séries anuais
+            por_ano={ano: cubo.filtrar(b.cubo, **sel) for ano, b in bases.items()},
+        )
+    return recortar
+
+
+# Pré-aquecimento opcional (CENSO_PREAQUECER_FIGURAS=1): todas as combinações
+# dos filtros, uma vez por cache e versão dos dados
+@st.cache_resource(show_spinner="Preparando os gráficos...")
+def _aquecer(id_cache, versao, _graficos, _opcoes):
+    _graficos.aquecer(_opcoes)
+
+
+def preaquecer(graficos, opcoes):
+    _aquecer(id(graficos.cache), graficos.versao, graficos, opcoes)
+
+
+def registrar_figuras(graficos, titulos=None, colunas_corr=COLUNAS_CORR):
+    """Registra os gráficos dos dashboards em graficos; titulos troca os de TITULOS."""
+    titulos = {**TITULOS, **(titulos or {})}
+
+    # -----------------------------
+    # 📍 Aba 1: Dados gerais
+    # -----------------------------
+    @graficos.figura("localizacao")
+    def figura_localizacao(r):
+        local = cubo.contar(r.cubo, 'TP_LOCALIZACAO', dados.LOCALIZACOES).reset_index()
+        local.columns = ['Localização', 'Quantidade']
+        return px.pie(local, values='Quantidade', names='Localização', title=titulos["localizacao"])
+
+    @graficos.figura("dependencia")
+    def figura_dependencia(r):
+        dep = cubo.contar(r.cubo, 'TP_DEPENDENCIA', dados.DEPENDENCIAS).reset_index()
+        dep.columns = ['Dependência', 'Quantidade']
+        return px.bar(dep, x='Dependência', y='Quantidade', color='Dependência',
+                      title=titulos["dependencia"])
+
+    @graficos.figura("dependencia_anos")
+    def figura_dependencia_anos(r):
+        # Série anual a partir do cubo de cada partição (mesmo filtro em todos os anos)
+        evolucao = cubo.por_particao(
+            r.por_ano, lambda c: cubo.contar(c, 'TP_DEPENDENCIA', dados.DEPENDENCIAS)
+        )
+        evolucao.index.name, evolucao.columns.name = 'Ano', 'Dependência'
+        fig_anos = px.line(evolucao, markers=True, title=titulos["dependencia_anos"],
+                           labels={'value': 'Quantidade de Escolas'})
+        fig_anos.update_xaxes(dtick=1)
+        return fig_anos
+
+    # Matrículas de todos os anos escolhidos, sem o filtro da barra lateral
+    @graficos.figura("raca", filtrada=False)
+    def figura_raca(r):
+        # Nomes legíveis só nos seis totais (rotulos.py)
+        totais_raca = rotulos.rotular(cubo.somar(r.cubo, dados.COLUNAS_RACA).sort_values(ascending=True))
+
+        df_raca = pd.DataFrame({
+            'Cor/Raça': totais_raca.index,
+            'Quantidade': totais_raca.values
+        })
+
+        fig_raca = px.bar(
+            df_raca,
+            x='Quantidade',
+            y='Cor/Raça',
+            orientation='h',
+            text='Quantidade',
+            color='Cor/Raça',
+            color_discrete_sequence=px.colors.sequential.Greens_r,
+            title=titulos["raca"]
+        )
+
+        fig_raca.update_layout(
+            xaxis_title='Quantidade de Matrículas',
+            yaxis_title='Cor/Raça',
+            plot_bgcolor='rgba(0,0,0,0)',
+            yaxis=dict(categoryorder='total ascending')
+        )
+
+        fig_raca.update_traces(textposition='outside')
+        return fig_raca
+
+    # -----------------------------
+    # ⚡ Aba 3: Sustentabilidade
+    # -----------------------------
+    @graficos.figura("energia")
+    def figura_energia(r):
+        energia = cubo.contar(r.cubo, 'IN_ENERGIA_RENOVAVEL', dados.ENERGIAS).reset_index()
+        energia.columns = ['Energia', 'Quantidade']
+        return px.pie(energia, values='Quantidade', names='Energia', title=titulos["energia"])
+
+    @graficos.figura("energia_anos")
+    def figura_energia_anos(r):
+        energia_anos = cubo.por_particao(
+            r.por_ano, lambda c: cubo.contar(c, 'IN_ENERGIA_RENOVAVEL', dados.ENERGIAS)
+        )
+        energia_anos.index.name, energia_anos.columns.name = 'Ano', 'Energia'
+        fig_energia_anos = px.line(energia_anos, markers=True, title=titulos["energia_anos"],
+                                   labels={'value': 'Quantidade de Escolas'})
+        fig_energia_anos.update_xaxes(dtick=1)
+        return fig_energia_anos
+
+    # Todas as dependências dos anos escolhidos, sem o filtro da barra lateral
+    @graficos.figura("energia_por_tipo", filtrada=False)
+    def figura_energia_por_tipo(r):
+        renovavel = cubo.filtrar(r.cubo, IN_ENERGIA_RENOVAVEL=[1])
+        renovavel_por_tipo = cubo.contar(renovavel, 'TP_DEPENDENCIA', dados.DEPENDENCIAS).sort_values(ascending=True)
+
+        df_energia_tipo = renovavel_por_tipo.reset_index()
+        df_energia_tipo.columns = ['Tipo de Escola', 'Quantidade']
+
+        fig5 = px.bar(
+            df_energia_tipo,
+            x='Quantidade',
+            y='Tipo de Escola',
+            orientation='h',
+            text='Quantidade',
+            color='Tipo de Escola',
+            color_discrete_sequence=px.colors.sequential.Greens_r,
+            title=titulos["energia_por_tipo"]
+        )
+
+        fig5.update_layout(
+            yaxis=dict(categoryorder='total ascending'),
+            xaxis_title='Quantidade de Escolas',
+            yaxis_title='Tipo de Escola',
+            plot_bgcolor='rgba(0,0,0,0)',
+            title_x=0.3
+        )
+
+        fig5.update_traces(textposition='outside')
+        return fig5
+
+    @graficos.figura("agua")
+    def figura_agua(r):
+        agua_data = rotulos.rotular(cubo.somar(r.cubo, dados.COLUNAS_AGUA))
+        agua_legenda = list(agua_data.index)
+        return px.bar(
+            x=agua_legenda,
+            y=agua_data,
+            title=titulos["agua"],
+            labels={'x': 'Tipo de Abastecimento', 'y': 'Quantidade de Escolas'},
+            color=agua_legenda,
+            color_discrete_sequence=px.colors.sequential.Greens_r
+        )
+
+    @graficos.figura("lixo")
+    def figura_lixo(r):
+        # Soma total por tipo, com o nome legível para o eixo
+        totais_lixo = rotulos.rotular(cubo.somar(r.cubo, dados.COLUNAS_LIXO).sort_values())
+
+        df_lixo = pd.DataFrame({
+            'Tipo': totais_lixo.index,
+            'Quantidade': totais_lixo.values
+        })
+
+        fig_lixo = px.bar(
+            df_lixo,
+            x='Quantidade',
+            y='Tipo',
+            orientation='h',
+            color='Tipo',
+            text='Quantidade',
+            title=titulos["lixo"],
+            color_discrete_sequence=px.colors.sequential.Greens_r
+        )
+
+        fig_lixo.update_layout(
+            yaxis_title='Tipo de Tratamento',
+            xaxis_title='Quantidade de Escolas',
+            plot_bgcolor='rgba(0,0,0,0)',
+            yaxis=dict(categoryorder='total ascending')
+        )
+
+        fig_lixo.update_traces(textposition='outside')
+        return fig_lixo
+
+    @graficos.figura("correlacao")
+    def figura_correlacao(r):
+        # Matriz de correlação só das colunas com estatísticas na ingestão
+        disponiveis = correlacao.colunas_das_estatisticas(r.estatisticas)
+        colunas = [col for col in colunas_corr if col in disponiveis]
+        # Só a matriz pequena recebe os nomes de exibição
+        matriz_corr = rotulos.rotular(correlacao.matriz(r.estatisticas, colunas).round(2))
+
+        return px.imshow(
+            matriz_corr,
+            text_auto=True,
+            color_continuous_scale='YlGnBu',
+            title=titulos["correlacao"],
+            aspect='auto'
+        )
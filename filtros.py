@@ -0,0 +1,57 @@
+# -----------------------------
+# 🔍 Motor de filtros da base
+# -----------------------------
+# Filtrar com df[df['Dependência'].isin(...)] copia a base inteira a cada rerun.
+# Aqui cada valor de cada coluna filtrável vira um bitmap (1 bit por escola),
+# montado uma vez junto com a base. Um filtro é um OU dos bitmaps dos valores
+# escolhidos e vários filtros se combinam com E; quem consome recebe uma máscara
+# booleana das linhas, nunca um DataFrame copiado.
+
+import numpy as np
+import pandas as pd
+
+
+class MotorFiltros:
+    def __init__(self, df, colunas):
+        self.n = len(df)
+        self.bitmaps = {}
+        for coluna in colunas:
+            if coluna not in df.columns:
+                continue
+            codigos, valores = pd.factorize(df[coluna])
+            self.bitmaps[coluna] = {
+                valor: np.packbits(codigos == i) for i, valor in enumerate(valores)
+            }
+
+    def bitmap(self, **filtros):
+        # None quando nenhum filtro restringe nada (todas as linhas)
+        resultado = None
+        for coluna, aceitos in filtros.items():
+            if aceitos is None or coluna not in self.bitmaps:
+                continue
+            bits = np.zeros((self.n + 7) // 8, dtype=np.uint8)
+            for valor in aceitos:
+                if valor in self.bitmaps[coluna]:
+                    bits |= self.bitmaps[coluna][valor]
+            resultado = bits if resultado is None else resultado & bits
+        return resultado
+
+    def mascara(self, **filtros):
+        bits = self.bitmap(**filtros)
+        if bits is None:
+            return np.ones(self.n, dtype=bool)
+        return np.unpackbits(bits, count=self.n).astype(bool)
+
+
+def opcoes_do_filtro(cubo, coluna, nomes):
+    # Valores presentes no cubo, com os nomes mostrados na tela
+    presentes = sorted(cubo[coluna].dropna().unique())
+    return [nomes[c] for c in presentes] if nomes else presentes
+
+
+def selecao_para_codigos(escolhidos, nomes):
+    # Caminho inverso: nomes escolhidos na tela -> códigos do INEP
+    if not nomes:
+        return list(escolhidos)
+    inverso = {nome: codigo for codigo, nome in nomes.items()}
+    return [inverso[e] for e in escolhidos if e in inverso]
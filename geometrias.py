@@ -0,0 +1,78 @@
+# -----------------------------
+# 🧭 Geometrias dos mapas
+# -----------------------------
+# Os polígonos ficam em arquivos GeoJSON em assets/ (não mais como um
+# dicionário no meio dos scripts). Cada nível é lido uma vez por processo e
+# simplificado (Douglas–Peucker, geopandas) em algumas tolerâncias, com as
+# coordenadas quantizadas numa grade proporcional; o mapa pede a versão que
+# combina com o zoom e recebe o GeoJSON já serializado e compacto.
+#
+# Regiões vêm com o projeto e são o único nível desenhado hoje (mapa.py); UFs e
+# municípios são lidos pelas mesmas funções se os arquivos forem colocados em assets/.
+
+import functools
+import json
+import os
+
+import geopandas as gpd
+
+PASTA_ASSETS = "assets"
+
+# nível -> arquivo em assets/
+NIVEIS = {
+    "regioes": "regioes.geojson",
+    "ufs": "ufs.geojson",
+    "municipios": "municipios.geojson",
+}
+
+# nome -> (tolerância do Douglas–Peucker em graus, casas decimais da quantização)
+TOLERANCIAS = {
+    "detalhada": (0.0, 4),
+    "media": (0.02, 3),
+    "simples": (0.1, 2),
+}
+
+
+def caminho_do_nivel(nivel, pasta=PASTA_ASSETS):
+    return os.path.join(pasta, NIVEIS[nivel])
+
+
+def tolerancia_para_zoom(zoom):
+    # No zoom z um pixel tem ~360/(256·2^z) graus: a tolerância fica abaixo de um pixel
+    if zoom <= 5:
+        return "simples"
+    if zoom <= 8:
+        return "media"
+    return "detalhada"
+
+
+@functools.lru_cache(maxsize=None)
+def carregar(nivel, pasta=PASTA_ASSETS):
+    with open(caminho_do_nivel(nivel, pasta), encoding="utf-8") as f:
+        return gpd.GeoDataFrame.from_features(json.load(f)["features"], crs="EPSG:4326")
+
+
+def arredondar(coordenadas, casas):
+    if isinstance(coordenadas[0], (int, float)):
+        return [round(c, casas) for c in coordenadas]
+    return [arredondar(c, casas) for c in coordenadas]
+
+
+@functools.lru_cache(maxsize=None)
+def geojson(nivel, tolerancia="media", pasta=PASTA_ASSETS):
+    """GeoJSON compacto (texto) do nível, simplificado e quantizado; um por (nível, tolerância)."""
+    distancia, casas = TOLERANCIAS[tolerancia]
+    gdf = carregar(nivel, pasta)
+    geometrias = gdf.geometry.simplify(distancia, preserve_topology=True) if distancia else gdf.geometry
+
+    # Quantização: coordenadas arredondadas na grade de 10^-casas graus
+    propriedades = gdf.drop(columns="geometry").to_dict("records")
+    feicoes = []
+    for props, geometria in zip(propriedades, geometrias):
+        forma = geometria.__geo_interface__
+        feicoes.append({
+            "type": "Feature",
+            "properties": props,
+            "geometry": {"type": forma["type"], "coordinates": arredondar(forma["coordinates"], casas)},
+        })
+    return json.dumps({"type": "FeatureCollection", "features": feicoes}, separators=(",", ":"))
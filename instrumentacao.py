@@ -0,0 +1,169 @@
+# -----------------------------
+# 🐞 Medições por etapa
+# -----------------------------
+# Quando um rerun fica lento não dá para saber se foi o download, a base, o
+# mapa, a correlação ou o treino. Cada script cria um Medidor por execução e
+# envolve as etapas com `with medidor.etapa("nome"):`; cada etapa guarda o
+# tempo e, se ligado, a memória alocada (tracemalloc). As medições aparecem num
+# painel opcional na barra lateral e, com CENSO_LOG_MEDICOES=arquivo.jsonl, são
+# acrescentadas ao log (uma linha JSON por execução, com sessão e filtros), de
+# onde saem p50/p95 por etapa: python instrumentacao.py arquivo.jsonl
+#
+# O tracemalloc deixa o Python bem mais lento e vale para o processo inteiro:
+# fica desligado, a não ser com CENSO_MEDIR_MEMORIA=1 ou enquanto alguma sessão
+# com "Medir memória" marcado no painel estiver dentro de uma etapa. Cada etapa
+# de fora liga e desliga o tracemalloc no seu try/finally, então um st.stop(),
+# um rerun ou uma exceção no meio do script não o deixam ligado. Os números de
+# memória incluem o que outras sessões alocaram ao mesmo tempo.
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+ARQUIVO_LOG = os.environ.get("CENSO_LOG_MEDICOES", "")
+MEDIR_MEMORIA = os.environ.get("CENSO_MEDIR_MEMORIA") == "1"
+
+_trava_log = threading.Lock()
+_trava_memoria = threading.Lock()
+_usos_memoria = 0
+
+
+def id_da_sessao():
+    # Um id por sessão do navegador, guardado no session_state
+    if "id_sessao" not in st.session_state:
+        st.session_state["id_sessao"] = uuid.uuid4().hex[:12]
+    return st.session_state["id_sessao"]
+
+
+def ligar_memoria():
+    global _usos_memoria
+    with _trava_memoria:
+        if _usos_memoria == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _usos_memoria += 1
+
+
+def desligar_memoria():
+    global _usos_memoria
+    with _trava_memoria:
+        _usos_memoria -= 1
+        if _usos_memoria == 0 and not MEDIR_MEMORIA:
+            tracemalloc.stop()
+
+
+class Medidor:
+    def __init__(self, script, sessao=None, memoria=None):
+        self.script = script
+        self.sessao = sessao or id_da_sessao()
+        if memoria is None:
+            memoria = MEDIR_MEMORIA or st.session_state.get("depuracao_memoria", False)
+        self.memoria = memoria
+        self.inicio = time.perf_counter()
+        self.etapas = []
+        self.extras = {}
+        self.pilha = []
+
+    @contextmanager
+    def etapa(self, nome):
+        # Etapas podem ser aninhadas; o nome registrado leva o caminho ("aba/modelo")
+        externa = self.pilha[-1] if self.pilha else None
+        registro = {"etapa": f"{externa['etapa']}/{nome}" if externa else nome, "ms": None}
+        self.etapas.append(registro)
+        self.pilha.append(registro)
+
+        # Só a etapa de fora liga o tracemalloc; as de dentro usam o mesmo
+        ligou_memoria = self.memoria and externa is None
+        if ligou_memoria:
+            ligar_memoria()
+
+        # O pico do tracemalloc é um só: antes de zerá-lo para esta etapa, a de
+        # fora guarda o que já tinha visto (pico_abs, em bytes, some ao sair)
+        medir_memoria = self.memoria and tracemalloc.is_tracing()
+        if medir_memoria:
+            atual, pico = tracemalloc.get_traced_memory()
+            if externa is not None:
+                externa["pico_abs"] = max(externa.get("pico_abs", 0), pico)
+            tracemalloc.reset_peak()
+            memoria_inicial = atual
+
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro["ms"] = (time.perf_counter() - inicio) * 1000
+            self.pilha.pop()
+            if medir_memoria and tracemalloc.is_tracing():
+                atual, pico = tracemalloc.get_traced_memory()
+                pico = max(pico, registro.pop("pico_abs", 0))
+                registro["memoria_kb"] = (atual - memoria_inicial) / 1024
+                registro["pico_kb"] = (pico - memoria_inicial) / 1024
+                if externa is not None:
+                    externa["pico_abs"] = max(externa.get("pico_abs", 0), pico)
+            if ligou_memoria:
+                desligar_memoria()
+
+    def informar(self, chave, valor):
+        # Valores que não são etapas (p.ex. tempo de treino guardado com o modelo)
+        self.extras[chave] = valor
+
+    def total_ms(self):
+        return (time.perf_counter() - self.inicio) * 1000
+
+    def tabela(self):
+        return pd.DataFrame(self.etapas).round(1)
+
+    def registrar(self, estado, caminho=ARQUIVO_LOG):
+        """Acrescenta esta execução ao log JSON lines (nada sem CENSO_LOG_MEDICOES)."""
+        if not caminho:
+            return
+        linha = json.dumps({
+            "data": datetime.now().isoformat(timespec="milliseconds"),
+            "script": self.script,
+            "sessao": self.sessao,
+            "estado": estado,
+            "total_ms": self.total_ms(),
+            "etapas": self.etapas,
+            "extras": self.extras,
+        }, default=str, ensure_ascii=False)
+        with _trava_log, open(caminho, "a", encoding="utf-8") as f:
+            f.write(linha + "\n")
+
+
+def painel(medidor):
+    # Painel opcional na barra lateral; as medições são desta execução
+    if not st.sidebar.checkbox("🐞 Medições por etapa", key="depuracao"):
+        return
+    st.sidebar.checkbox("Medir memória (tracemalloc, mais lento)", key="depuracao_memoria")
+    st.sidebar.dataframe(medidor.tabela(), hide_index=True, use_container_width=True)
+    st.sidebar.caption(f"Sessão {medidor.sessao} · {medidor.total_ms():.0f} ms no total")
+    for chave, valor in medidor.extras.items():
+        st.sidebar.caption(f"{chave}: {valor}")
+
+
+def resumo(caminho=ARQUIVO_LOG):
+    """p50/p95 (ms) e número de execuções por script e etapa, a partir do log."""
+    linhas = []
+    with open(caminho, encoding="utf-8") as f:
+        for texto in f:
+            registro = json.loads(texto)
+            for etapa in registro["etapas"]:
+                linhas.append({"script": registro["script"], "etapa": etapa["etapa"], "ms": etapa["ms"]})
+    tempos = pd.DataFrame(linhas).groupby(["script", "etapa"])["ms"]
+    return pd.DataFrame({
+        "execucoes": tempos.size(),
+        "p50_ms": tempos.quantile(0.5),
+        "p95_ms": tempos.quantile(0.95),
+    }).round(1)
+
+
+if __name__ == "__main__":
+    import sys
+    print(resumo(sys.argv[1] if len(sys.argv) > 1 else ARQUIVO_LOG).to_string())
@@ -0,0 +1,184 @@
+# -----------------------------
+# 🗺️ Mapa das regiões
+# -----------------------------
+# Montar o folium.Map, serializar o GeoJSON e adicionar os marcadores a cada
+# rerun refaz o mesmo trabalho e reenvia a mesma página ao navegador. O HTML do
+# mapa só depende das contagens por região (ou seja, do filtro) e da moldura,
+# então é gerado uma vez por combinação e guardado num LRU; um rerun com o
+# mesmo filtro só reenvia a string pronta.
+
+import functools
+
+import folium
+import numpy as np
+import streamlit as st
+import streamlit.components.v1 as components
+from streamlit_folium import st_folium
+
+import geometrias
+import pontos
+
+CORES_REGIOES = {
+    "NORTE": "#fde091",
+    "NORDESTE": "#9c4002",
+    "SUL": "#e7b44c",
+    "CENTRO-OESTE": "#fff7cd",
+    "SUDESTE": "#b96f00"
+}
+
+COORDENADAS_REGIOES = {
+    "NORTE": (-2.5, -60.0),
+    "NORDESTE": (-8.5, -38.5),
+    "CENTRO-OESTE": (-15.5, -56.1),
+    "SUDESTE": (-20.5, -43.5),
+    "SUL": (-27.5, -50.5)
+}
+
+# Casas decimais das coordenadas dos pontos enviados ao navegador (4 ≈ 11 m)
+PRECISAO = 4
+
+
+def estilo_regiao(feature):
+    return {
+        'fillColor': CORES_REGIOES[feature['properties']['name']],
+        'color': 'black',
+        'weight': 2,
+        'fillOpacity': 0.3,
+    }
+
+
+@functools.lru_cache(maxsize=64)
+def html_do_mapa(contagens, centro=(-14.5, -52.5), zoom=4, altura=500):
+    """HTML completo do mapa para as contagens (tupla de (região, escolas))."""
+    mapa = folium.Map(location=list(centro), zoom_start=zoom)
+
+    # Adiciona polígonos para todas as regiões
+    folium.GeoJson(
+        geometrias.geojson("regioes", geometrias.tolerancia_para_zoom(zoom)),
+        name="Regiões do Brasil",
+        style_function=estilo_regiao,
+        tooltip=folium.GeoJsonTooltip(fields=["name"], aliases=["Região:"])
+    ).add_to(mapa)
+
+    for regiao, qtd in contagens:
+        lat, lon = COORDENADAS_REGIOES.get(regiao, (None, None))
+        if lat and lon:
+            folium.Marker(
+                location=[lat, lon],
+                popup=f"<b>{regiao}</b><br>Escolas: {qtd}",
+                icon=folium.Icon(color='darkblue', icon='school', prefix='fa')
+            ).add_to(mapa)
+
+    return folium.Figure(height=altura).add_child(mapa).render()
+
+
+def contagens_por_regiao(escolas_por_regiao):
+    # Series região -> escolas (cubo.contar) como chave hashável; marcadores e legenda usam a mesma
+    return tuple((str(regiao), int(qtd)) for regiao, qtd in escolas_por_regiao.items())
+
+
+def mostrar_mapa(escolas_por_regiao, largura=700, altura=500, centro=(-14.5, -52.5), zoom=4):
+    contagens = contagens_por_regiao(escolas_por_regiao)
+    components.html(html_do_mapa(contagens, centro, zoom, altura), width=largura, height=altura + 10)
+
+
+@functools.lru_cache(maxsize=64)
+def html_da_legenda(contagens):
+    # Um único bloco HTML: cor da região e escolas no filtro atual (formato brasileiro)
+    por_regiao = dict(contagens)
+    itens = []
+    for regiao, cor in CORES_REGIOES.items():
+        qtd = f"{por_regiao.get(regiao, 0):,}".replace(",", ".")
+        itens.append(
+            "<div style='display: flex; align-items: center; gap: 8px; margin-bottom: 6px;'>"
+            f"<div style='width: 20px; height: 20px; background-color: {cor}; border: 1px solid #000;'></div>"
+            f"<div><b>{regiao}</b>: {qtd} escolas</div>"
+            "</div>"
+        )
+    return "".join(itens)
+
+
+def mostrar_legenda(escolas_por_regiao):
+    st.markdown(html_da_legenda(contagens_por_regiao(escolas_por_regiao)), unsafe_allow_html=True)
+
+
+# -----------------------------
+# 📌 Mapa de escolas (pontos agregados no servidor, ver pontos.py)
+# -----------------------------
+def estilo_ponto(feature):
+    # Raio pelo log2 da contagem: poucos estilos distintos, que o folium guarda uma vez só
+    return {"radius": min(3 + 2 * int(np.log2(feature["properties"]["escolas"])), 24)}
+
+
+def camada_de_escolas(celulas):
+    # Todos os pontos num único GeoJSON (um CircleMarker por ponto no lado do navegador)
+    camada = folium.FeatureGroup(name="Escolas")
+    if len(celulas) == 0:
+        return camada
+    feicoes = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [round(lon, PRECISAO), round(lat, PRECISAO)]},
+            "properties": {"escolas": int(escolas)},
+        }
+        for lat, lon, escolas in celulas[['lat', 'lon', 'escolas']].itertuples(index=False)
+    ]
+    folium.GeoJson(
+        {"type": "FeatureCollection", "features": feicoes},
+        marker=folium.CircleMarker(radius=4, weight=1, color="#08306b",
+                                   fill=True, fill_color="#2171b5", fill_opacity=0.6),
+        style_function=estilo_ponto,
+        tooltip=folium.GeoJsonTooltip(fields=["escolas"], aliases=["Escolas:"])
+    ).add_to(camada)
+    return camada
+
+
+def limites_da_visao(bounds):
+    # bounds do Leaflet (st_folium) -> (sul, oeste, norte, leste)
+    try:
+        return (bounds["_southWest"]["lat"], bounds["_southWest"]["lng"],
+                bounds["_northEast"]["lat"], bounds["_northEast"]["lng"])
+    except (KeyError, TypeError):
+        return None
+
+
+def mostrar_mapa_escolas(pontos, mascara=None, chave="mapa_escolas", altura=600,
+                         centro=(-14.5, -52.5), zoom=4):
+    """Mapa de pontos que acompanha o zoom; devolve (células enviadas, zoom da grade)."""
+    # O st_folium guarda em session_state[chave] o zoom e a área visível da última
+    # interação; a camada de pontos é montada para essa visão
+    visao = st.session_state.get(chave) or {}
+    celulas, zoom_grade = pontos.visiveis(visao.get("zoom") or zoom, mascara,
+                                          limites_da_visao(visao.get("bounds")))
+
+    # O mapa de fundo é sempre o mesmo; só a camada de pontos é trocada a cada movimento
+    st_folium(
+        folium.Map(location=list(centro), zoom_start=zoom),
+        key=chave,
+        height=altura,
+        use_container_width=True,
+        feature_group_to_add=camada_de_escolas(celulas),
+        returned_objects=["zoom", "bounds"],
+    )
+    return celulas, zoom_grade
+
+
+# Coordenadas das escolas, montadas uma vez por versão dos dados (None sem fonte de coordenadas)
+@st.cache_resource(show_spinner="Localizando as escolas...")
+def obter_pontos(_base, versao):
+    coordenadas = pontos.coordenadas_das_escolas(_base.df)
+    return pontos.PontosEscolas(*coordenadas) if coordenadas else None
+
+
+def mostrar_secao_pontos(base, selecao, ano):
+    """Escolha Regiões/Escolas da aba do mapa; True se o mapa de escolas foi mostrado."""
+    pontos_escolas = obter_pontos(base, base.versao)
+    if pontos_escolas is None or not len(pontos_escolas):
+        return False
+    modo = st.radio("Visualização", ["Regiões", "Escolas"], horizontal=True, key="modo_mapa")
+    if modo != "Escolas":
+        return False
+    celulas, zoom_grade = mostrar_mapa_escolas(pontos_escolas, base.filtros.mascara(**selecao))
+    st.caption(f"{int(celulas['escolas'].sum())} escolas de {ano} na área visível, "
+               f"em {len(celulas)} pontos (grade do zoom {zoom_grade}).")
+    return True
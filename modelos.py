@@ -0,0 +1,129 @@
+# -----------------------------
+# 🎓 Armazém de modelos treinados
+# -----------------------------
+# Treinar o RandomForest (ou o KNN) a cada interação com a tela leva segundos.
+# Cada modelo é treinado uma vez por (algoritmo, hiperparâmetros, colunas,
+# versão dos dados) e salvo em disco junto com as previsões e a matriz de
+# confusão; depois disso, trocar de algoritmo só relê o arquivo.
+
+import hashlib
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, confusion_matrix
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+import vizinhos
+
+PASTA_MODELOS = "modelos_cache"
+
+# Entra na chave do modelo: muda quando o que vai salvo junto com ele muda
+# (3: desempate do índice por padrões pela ordem do treino)
+VERSAO_RESULTADO = 3
+
+# Classes das escolas, na ordem das linhas/colunas da matriz de confusão
+CLASSES = [1, 2, 3, 4]  # Federal, Estadual, Municipal, Privada
+
+# Núcleos usados no fit/predict (-1 = todos). Não entra na chave do modelo: com
+# random_state fixo, árvores e vizinhos saem iguais com qualquer número de núcleos
+N_JOBS_PADRAO = int(os.environ.get("CENSO_N_JOBS", "-1"))
+
+ALGORITMOS = {
+    "K-Nearest Neighbors (KNN)": (vizinhos.criar_knn, {"n_neighbors": 5, "indice": "padroes"}),
+    "Random Forest": (RandomForestClassifier, {"n_estimators": 100, "random_state": 42}),
+}
+
+
+def extrair_atributos(df, colunas, mascara=None, alvo='TP_DEPENDENCIA'):
+    """Atributos (float32) e classes (uint8) das escolas completas e com dependência válida.
+
+    mascara (opcional) restringe as linhas antes, p.ex. vinda de MotorFiltros.
+    """
+    atributos = [c for c in colunas if c != alvo]
+    validas = df[colunas].notna().all(axis=1).to_numpy() & df[alvo].isin(CLASSES).to_numpy()
+    if mascara is not None:
+        validas &= mascara
+
+    X = np.empty((int(validas.sum()), len(atributos)), dtype=np.float32)
+    for j, coluna in enumerate(atributos):
+        X[:, j] = np.asarray(df[coluna].astype('float32'))[validas]
+    y = np.asarray(df[alvo].astype('float32'))[validas].astype(np.uint8)
+
+    # Compartilhados entre sessões: ninguém deve escrever neles
+    X.setflags(write=False)
+    y.setflags(write=False)
+    return X, y
+
+
+def chave_do_modelo(algoritmo, parametros, colunas, versao):
+    conteudo = json.dumps([algoritmo, parametros, list(colunas), versao, VERSAO_RESULTADO],
+                          sort_keys=True, default=str)
+    return hashlib.sha1(conteudo.encode()).hexdigest()[:16]
+
+
+def ajustar_n_jobs(modelo, n_jobs):
+    # O último passo do pipeline é o classificador (KNN e RandomForest aceitam n_jobs)
+    modelo[-1].set_params(n_jobs=n_jobs)
+    return modelo
+
+
+def treinar(X, y, algoritmo, parametros, n_jobs=N_JOBS_PADRAO):
+    classe, _ = ALGORITMOS[algoritmo]
+
+    # Separar treino e teste
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
+
+    # Padronizar dentro do pipeline (recomendado para KNN): o scaler vai salvo junto com o modelo
+    modelo = make_pipeline(StandardScaler(), classe(**parametros, n_jobs=n_jobs))
+
+    inicio = time.perf_counter()
+    modelo.fit(X_train, y_train)
+    tempo_treino = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    y_pred = modelo.predict(X_test)
+    tempo_previsao = time.perf_counter() - inicio
+
+    resultado = {
+        "modelo": modelo,
+        "y_pred": y_pred,
+        "matriz": confusion_matrix(y_test, y_pred, labels=CLASSES),
+        "acuracia": accuracy_score(y_test, y_pred),
+        "tempo_treino": tempo_treino,
+        "tempo_previsao": tempo_previsao,
+    }
+    if classe is vizinhos.criar_knn:
+        # Recall do índice de vizinhos em relação à força bruta
+        resultado["avaliacao_indice"] = vizinhos.avaliar_indice(modelo, X_train, y_train, X_test)
+    return resultado
+
+
+def obter_modelo(algoritmo, colunas, versao, carregar_dados, parametros=None,
+                 n_jobs=N_JOBS_PADRAO, pasta=PASTA_MODELOS):
+    """Devolve o resultado do treino, treinando só se ainda não houver um salvo.
+
+    carregar_dados é chamado apenas quando é preciso treinar e deve devolver (X, y).
+    """
+    if parametros is None:
+        parametros = ALGORITMOS[algoritmo][1]
+
+    caminho = os.path.join(pasta, chave_do_modelo(algoritmo, parametros, colunas, versao) + ".joblib")
+    if os.path.isfile(caminho):
+        resultado = joblib.load(caminho)
+        ajustar_n_jobs(resultado["modelo"], n_jobs)
+        return resultado
+
+    X, y = carregar_dados()
+    resultado = treinar(X, y, algoritmo, parametros, n_jobs)
+
+    os.makedirs(pasta, exist_ok=True)
+    tmp = caminho + ".tmp"
+    joblib.dump(resultado, tmp)
+    os.replace(tmp, caminho)
+    return resultado
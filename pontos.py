@@ -0,0 +1,100 @@
+# -----------------------------
+# 📌 Escolas como pontos, agregadas por zoom
+# -----------------------------
+# Um folium.Marker por escola (~225 mil) trava o navegador. Aqui as escolas
+# são agrupadas no servidor numa grade em pixels do zoom atual (Web Mercator):
+# cada célula de CELULA_PX × CELULA_PX pixels vira um único ponto, no centro
+# das escolas que caíram nela, com a contagem. Só as células dentro da área
+# visível são enviadas, e se ainda passarem de MAX_FEICOES a grade engrossa
+# (zoom menor) até caber.
+#
+# Coordenadas: NU_LATITUDE/NU_LONGITUDE, quando a base trouxer; senão o
+# centroide do município (CO_MUNICIPIO) tirado de assets/municipios.csv, com as
+# colunas codigo_ibge, latitude e longitude. Sem nenhuma das duas fontes o mapa
+# de escolas não é oferecido.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+ARQUIVO_MUNICIPIOS = os.path.join("assets", "municipios.csv")
+
+# Máximo de pontos enviados ao navegador por renderização
+MAX_FEICOES = 2000
+
+# Lado da célula da grade, em pixels da tela
+CELULA_PX = 40
+
+
+def carregar_municipios(caminho=ARQUIVO_MUNICIPIOS):
+    # Centroides dos municípios indexados pelo código IBGE de 7 dígitos (None sem o arquivo)
+    if not os.path.isfile(caminho):
+        return None
+    municipios = pd.read_csv(caminho, usecols=['codigo_ibge', 'latitude', 'longitude'])
+    return municipios.set_index('codigo_ibge')
+
+
+def coordenadas_das_escolas(df, municipios=ARQUIVO_MUNICIPIOS):
+    """(lat, lon) de cada linha de df em float64 (NaN sem coordenada), ou None sem fonte."""
+    if {'NU_LATITUDE', 'NU_LONGITUDE'} <= set(df.columns):
+        return (df['NU_LATITUDE'].to_numpy(dtype=np.float64, na_value=np.nan),
+                df['NU_LONGITUDE'].to_numpy(dtype=np.float64, na_value=np.nan))
+    if 'CO_MUNICIPIO' in df.columns:
+        tabela = carregar_municipios(municipios)
+        if tabela is not None:
+            centroides = tabela.reindex(df['CO_MUNICIPIO'].to_numpy())
+            return (centroides['latitude'].to_numpy(dtype=np.float64),
+                    centroides['longitude'].to_numpy(dtype=np.float64))
+    return None
+
+
+class PontosEscolas:
+    def __init__(self, lat, lon):
+        # Só as escolas com coordenada dentro do que o Web Mercator representa
+        validas = np.isfinite(lat) & np.isfinite(lon) & (np.abs(lat) < 85)
+        self.linhas = np.flatnonzero(validas)
+        self.lat = lat[validas]
+        self.lon = lon[validas]
+
+        # Posição em [0, 1) no mapa-múndi do zoom 0; no zoom z é só multiplicar por 256·2^z pixels
+        seno = np.sin(np.radians(self.lat))
+        self.x = (self.lon + 180) / 360
+        self.y = 0.5 - np.log((1 + seno) / (1 - seno)) / (4 * np.pi)
+
+    def __len__(self):
+        return len(self.linhas)
+
+    def celulas(self, zoom, mascara=None, limites=None):
+        """Escolas agrupadas na grade do zoom: DataFrame com lat, lon (centro das escolas) e escolas.
+
+        mascara: booleano sobre todas as linhas da base (p.ex. MotorFiltros.mascara);
+        limites: (sul, oeste, norte, leste) da área visível.
+        """
+        sel = np.ones(len(self.linhas), dtype=bool)
+        if mascara is not None:
+            sel &= mascara[self.linhas]
+        if limites is not None:
+            sul, oeste, norte, leste = limites
+            sel &= (self.lat >= sul) & (self.lat <= norte) & (self.lon >= oeste) & (self.lon <= leste)
+
+        escala = 256 * 2 ** zoom / CELULA_PX
+        colunas = int(np.ceil(escala)) + 1
+        coluna = np.floor(self.x[sel] * escala).astype(np.int64)
+        linha = np.floor(self.y[sel] * escala).astype(np.int64)
+        _, inverso, escolas = np.unique(coluna * colunas + linha, return_inverse=True, return_counts=True)
+        inverso = inverso.ravel()
+        return pd.DataFrame({
+            'lat': np.bincount(inverso, weights=self.lat[sel]) / escolas,
+            'lon': np.bincount(inverso, weights=self.lon[sel]) / escolas,
+            'escolas': escolas,
+        })
+
+    def visiveis(self, zoom, mascara=None, limites=None, maximo=MAX_FEICOES):
+        # Grade do zoom pedido; se ainda tiver pontos demais, a de um zoom menor
+        zoom = max(int(zoom), 0)
+        while True:
+            celulas = self.celulas(zoom, mascara, limites)
+            if len(celulas) <= maximo or zoom == 0:
+                return celulas, zoom
+            zoom -= 1
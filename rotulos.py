@@ -0,0 +1,48 @@
+# -----------------------------
+# 🏷️ Rótulos de exibição
+# -----------------------------
+# A base e os agregados guardam os nomes de coluna do INEP (IN_AGUA_POTAVEL,
+# QT_MAT_BAS_PARDA...). Os nomes em português só entram na hora de montar a
+# figura, no índice do agregado pequeno que vai para o gráfico; a base nunca é
+# renomeada nem copiada por causa de um rótulo.
+
+import pandas as pd
+
+COLUNAS = {
+    'TP_DEPENDENCIA': 'Tipo de Escola',
+    'TP_LOCALIZACAO': 'Localização',
+    'NO_REGIAO': 'Região',
+    'IN_ENERGIA_RENOVAVEL': 'Energia Renovável',
+
+    'IN_AGUA_POTAVEL': 'Água Potável',
+    'IN_AGUA_REDE_PUBLICA': 'Rede Pública',
+    'IN_AGUA_POCO_ARTESIANO': 'Poço Artesiano',
+    'IN_AGUA_CACIMBA': 'Cacimba',
+    'IN_AGUA_FONTE_RIO': 'Fonte/Rio',
+    'IN_AGUA_INEXISTENTE': 'Sem Abastecimento',
+
+    'IN_TRATAMENTO_LIXO_SEPARACAO': 'Separação',
+    'IN_TRATAMENTO_LIXO_REUTILIZA': 'Reutilização',
+    'IN_TRATAMENTO_LIXO_RECICLAGEM': 'Reciclagem',
+    'IN_TRATAMENTO_LIXO_INEXISTENTE': 'Sem Tratamento',
+
+    'QT_MAT_BAS_ND': 'Não declarado',
+    'QT_MAT_BAS_BRANCA': 'Branca',
+    'QT_MAT_BAS_PRETA': 'Preta',
+    'QT_MAT_BAS_PARDA': 'Parda',
+    'QT_MAT_BAS_AMARELA': 'Amarela',
+    'QT_MAT_BAS_INDIGENA': 'Indígena',
+}
+
+
+def rotulo(coluna):
+    return COLUNAS.get(coluna, coluna)
+
+
+def rotular(agregado):
+    # Troca só os rótulos (índice da Series; índice e colunas do DataFrame), não os valores
+    if isinstance(agregado, pd.Series):
+        return agregado.set_axis([rotulo(c) for c in agregado.index])
+    return (agregado
+            .set_axis([rotulo(c) for c in agregado.index], axis=0)
+            .set_axis([rotulo(c) for c in agregado.columns], axis=1))
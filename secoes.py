@@ -0,0 +1,33 @@
+# -----------------------------
+# 📂 Seções sob demanda
+# -----------------------------
+# st.tabs executa o corpo de todas as abas a cada rerun (mapa, correlação,
+# treino dos modelos...), mesmo com só uma delas visível. Aqui cada seção é
+# uma função registrada com @secoes.secao(...) e só a escolhida é executada.
+
+import contextlib
+
+import streamlit as st
+
+
+class Secoes:
+    def __init__(self):
+        self.registro = {}
+
+    def secao(self, titulo):
+        def registrar(funcao):
+            self.registro[titulo] = funcao
+            return funcao
+        return registrar
+
+    def mostrar(self, chave="secao", medidor=None):
+        escolhida = st.radio(
+            "Seção",
+            list(self.registro),
+            horizontal=True,
+            key=chave,
+            label_visibility="collapsed"
+        )
+        # Com um medidor (instrumentacao.py), a seção escolhida vira uma etapa
+        with medidor.etapa(escolhida) if medidor else contextlib.nullcontext():
+            self.registro[escolhida]()
@@ -0,0 +1,193 @@
+# -----------------------------
+# 🧭 Índices de vizinhos para o KNN
+# -----------------------------
+# As 10 variáveis do modelo são indicadores 0/1 (mais a localização 1/2).
+# Depois do StandardScaler cada uma continua tendo só dois valores, então as
+# ~157 mil escolas de treino caem em no máximo 2^10 padrões distintos, e a
+# distância euclidiana entre dois padrões é uma distância de Hamming ponderada.
+# O índice "padroes" guarda as escolas de cada padrão (classe e posição no
+# treino) e busca os vizinhos entre os padrões, em vez de entre as escolas.
+# As distâncias são exatas. Quando o k-ésimo vizinho cai num padrão com várias
+# escolas, entram as que vêm primeiro no treino, como na força bruta, que
+# devolve a linha de menor índice entre pontos à mesma distância. O sklearn só
+# segue essa regra até o arredondamento: as distâncias que ele calcula para
+# escolas idênticas podem diferir na última casa, e aí ele desempata pelo
+# arredondamento. Por isso nenhum índice concorda 100% com a força bruta; nem
+# a KD-tree do próprio sklearn (~96% das previsões nos dados de 2022, contra
+# ~99,8% do índice por padrões, que por isso é o padrão).
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.neighbors import KNeighborsClassifier, NearestNeighbors
+
+INDICES = {
+    "padroes": "Por padrões (Hamming, exato)",
+    "kd_tree": "KD-tree (sklearn)",
+    "ball_tree": "Ball tree (sklearn)",
+    "brute": "Força bruta (sklearn)",
+}
+
+# Acima disso os dados não são de baixa cardinalidade e o índice por padrões não compensa
+LIMITE_PADROES = 4096
+
+
+def padroes_unicos(X):
+    """Linhas distintas de X e, para cada linha, o índice do seu padrão (como np.unique(axis=0)).
+
+    Cada coluna vira um código pequeno e a linha vira um inteiro (bits empacotados
+    quando as colunas são 0/1), o que é bem mais rápido que ordenar linhas de floats.
+    """
+    chave = np.zeros(len(X), dtype=np.int64)
+    combinacoes = 1
+    for j in range(X.shape[1]):
+        valores, codigos = np.unique(X[:, j], return_inverse=True)
+        combinacoes *= len(valores)
+        if combinacoes >= 2**62:
+            padroes, inverso = np.unique(X, axis=0, return_inverse=True)
+            return padroes, inverso.ravel()
+        chave = chave * len(valores) + codigos.ravel()
+    _, primeiro, inverso = np.unique(chave, return_index=True, return_inverse=True)
+    return X[primeiro], inverso.ravel()
+
+
+class KNNPadroes(ClassifierMixin, BaseEstimator):
+    def __init__(self, n_neighbors=5, n_jobs=None, bloco=256):
+        self.n_neighbors = n_neighbors
+        self.n_jobs = n_jobs  # aceito por compatibilidade com modelos.ajustar_n_jobs
+        self.bloco = bloco
+
+    def fit(self, X, y):
+        X = np.asarray(X, dtype=np.float64)
+        self.classes_, y_codigos = np.unique(np.asarray(y), return_inverse=True)
+        self.padroes_, inverso = padroes_unicos(X)
+        if len(self.padroes_) > LIMITE_PADROES:
+            raise ValueError(
+                f"{len(self.padroes_)} padrões distintos (limite {LIMITE_PADROES}); "
+                "use o índice kd_tree ou ball_tree"
+            )
+
+        # Quantas escolas de cada classe existem em cada padrão
+        self.contagens_ = np.zeros((len(self.padroes_), len(self.classes_)), dtype=np.int64)
+        np.add.at(self.contagens_, (inverso, y_codigos), 1)
+        self.tamanhos_ = self.contagens_.sum(axis=1)
+
+        # Escolas agrupadas por padrão, cada grupo na ordem do treino (para o desempate)
+        ordem = np.argsort(inverso, kind="stable")
+        self.linhas_ = ordem
+        self.classes_linhas_ = y_codigos[ordem]
+        self.inicio_ = np.concatenate([[0], np.cumsum(self.tamanhos_)])
+
+        # Classes das j primeiras escolas de cada padrão (j = 0..k): o caso comum, em
+        # que o k-ésimo vizinho cai num único padrão, sai sem percorrer as escolas
+        k = self.n_neighbors
+        self.prefixos_ = np.zeros((len(self.padroes_), k + 1, len(self.classes_)), dtype=np.int64)
+        for j in range(k):
+            self.prefixos_[:, j + 1] = self.prefixos_[:, j]
+            tem = np.flatnonzero(self.tamanhos_ > j)
+            self.prefixos_[tem, j + 1, self.classes_linhas_[self.inicio_[tem] + j]] += 1
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def _ordenar(self, consulta):
+        # Todos os padrões de treino em ordem de distância (exata) a cada padrão consultado
+        distancias = ((consulta[:, None, :] - self.padroes_[None, :, :]) ** 2).sum(axis=-1)
+        ordem = np.argsort(distancias, axis=1, kind="stable")
+        return ordem, np.sqrt(np.take_along_axis(distancias, ordem, axis=1))
+
+    def _primeiras(self, padroes, quantas):
+        # Classes das `quantas` escolas que vêm primeiro no treino entre as dos padrões empatados
+        grupos = [np.arange(self.inicio_[p], self.inicio_[p + 1]) for p in padroes]
+        posicoes = np.concatenate(grupos)
+        if len(grupos) > 1:
+            posicoes = posicoes[np.argsort(self.linhas_[posicoes], kind="stable")]
+        return np.bincount(self.classes_linhas_[posicoes[:quantas]], minlength=len(self.classes_))
+
+    def _votos(self, consulta):
+        k = self.n_neighbors
+        ordem, distancias = self._ordenar(consulta)
+        acumulado = np.cumsum(self.tamanhos_[ordem], axis=1)
+        # Posição (na ordem de distância) do padrão que completa os k vizinhos
+        ultimo = (acumulado < k).sum(axis=1)
+        limite = distancias[np.arange(len(consulta)), ultimo][:, None]
+        # Padrões à mesma distância do k-ésimo vizinho disputam as vagas que faltam
+        empatados = np.abs(distancias - limite) <= 1e-9 * np.maximum(limite, 1)
+        inteiros = (distancias < limite) & ~empatados
+
+        # Padrões que entram inteiros, de volta à ordem dos padrões, vezes as contagens por classe
+        pesos = np.zeros(distancias.shape)
+        np.put_along_axis(pesos, ordem, inteiros, axis=1)
+        votos = (pesos @ self.contagens_).astype(np.int64)
+        faltam = k - (self.tamanhos_[ordem] * inteiros).sum(axis=1)
+        unico = empatados.sum(axis=1) == 1
+        linhas = np.flatnonzero(unico)
+        votos[linhas] += self.prefixos_[ordem[linhas, ultimo[linhas]], faltam[linhas]]
+        # Vários padrões à mesma distância: as escolas deles intercaladas pela ordem do treino
+        for i in np.flatnonzero(~unico):
+            votos[i] += self._primeiras(ordem[i, empatados[i]], faltam[i])
+        return votos
+
+    def _por_padrao(self, X, funcao):
+        X = np.asarray(X, dtype=np.float64)
+        consulta, inverso = padroes_unicos(X)
+        partes = [funcao(consulta[i:i + self.bloco]) for i in range(0, len(consulta), self.bloco)]
+        return np.concatenate(partes)[inverso]
+
+    def predict_proba(self, X):
+        votos = self._por_padrao(X, self._votos)
+        return votos / votos.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        # Empate de votos: a primeira classe, como no KNeighborsClassifier
+        return self.classes_[np.argmax(self._por_padrao(X, self._votos), axis=1)]
+
+    def distancias_vizinhos(self, X):
+        # As k menores distâncias de cada consulta (cada padrão repetido pelo número de escolas)
+        def k_distancias(consulta):
+            ordem, distancias = self._ordenar(consulta)
+            acumulado = np.cumsum(self.tamanhos_[ordem], axis=1)
+            posicoes = np.stack([
+                np.searchsorted(a, np.arange(self.n_neighbors), side='right') for a in acumulado
+            ])
+            return np.take_along_axis(distancias, posicoes, axis=1)
+        return self._por_padrao(X, k_distancias)
+
+
+def criar_knn(n_neighbors=5, indice="padroes", n_jobs=None):
+    if indice == "padroes":
+        return KNNPadroes(n_neighbors=n_neighbors, n_jobs=n_jobs)
+    return KNeighborsClassifier(
+        n_neighbors=n_neighbors,
+        algorithm=indice,
+        n_jobs=n_jobs
+    )
+
+
+def avaliar_indice(modelo, X_train, y_train, X_test, amostra=1000, random_state=42):
+    """Compara o KNN de um pipeline (scaler + knn) com a força bruta numa amostra do teste.
+
+    recall: fração dos k vizinhos da força bruta recuperados (por distância, já que
+    escolas idênticas empatam); concordancia: fração de previsões iguais.
+    """
+    escalador, knn = modelo[:-1], modelo[-1]
+    rng = np.random.default_rng(random_state)
+    linhas = rng.choice(len(X_test), size=min(amostra, len(X_test)), replace=False)
+    teste = escalador.transform(X_test.iloc[linhas] if hasattr(X_test, "iloc") else X_test[linhas])
+    # A referência em float64: com a saída float32 do scaler a força bruta erra
+    # as distâncias na 7ª casa e os índices exatos pareceriam perder vizinhos
+    treino = np.asarray(escalador.transform(X_train), dtype=np.float64)
+    teste_64 = np.asarray(teste, dtype=np.float64)
+
+    k = knn.n_neighbors
+    bruta = NearestNeighbors(n_neighbors=k, algorithm="brute").fit(treino)
+    dist_bruta, _ = bruta.kneighbors(teste_64)
+    if isinstance(knn, KNNPadroes):
+        dist_indice = knn.distancias_vizinhos(teste)
+    else:
+        dist_indice, _ = knn.kneighbors(teste)
+    # Tolerância relativa: o índice pode ter calculado as distâncias em outra precisão
+    limite = dist_bruta[:, -1:] * (1 + 1e-6) + 1e-12
+    recall = float((dist_indice <= limite).mean())
+
+    previsto_bruta = KNeighborsClassifier(n_neighbors=k, algorithm="brute").fit(treino, y_train).predict(teste_64)
+    concordancia = float((knn.predict(teste) == previsto_bruta).mean())
+    return {"recall": recall, "concordancia": concordancia, "amostra": len(linhas)}